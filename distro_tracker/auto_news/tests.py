@@ -636,8 +636,10 @@ class GenerateNewsFromRepositoryUpdatesTest(TestCase):
             # The news is linked with the correct package
             self.assertEqual(news.package.name, name)
 
+    @mock.patch('distro_tracker.auto_news.tracker_tasks.HttpCache')
     @mock.patch('distro_tracker.auto_news.tracker_tasks.get_resource_content')
-    def test_dsc_file_in_news_content(self, mock_get_resource_content):
+    def test_dsc_file_in_news_content(self, mock_get_resource_content,
+                                      mock_http_cache):
         """
         Tests that the dsc file is found in the content of a news item created
         when a new package version appears.
@@ -645,8 +647,15 @@ class GenerateNewsFromRepositoryUpdatesTest(TestCase):
         name = 'package'
         version = '1.0.0'
         repository = 'repo'
-        self.create_source_package(name, version)
+        src_pkg = self.create_source_package(name, version)
+        src_pkg.directory = 'pool/main/p/package'
+        src_pkg.dsc_file_name = 'package_1.0.0.dsc'
+        src_pkg.save()
         self.add_source_package_to_repository(name, version, repository)
+        Repository.objects.filter(name=repository).update(
+            uri='http://deb.example.com/debian')
+        dsc_file_url = ('http://deb.example.com/debian/pool/main/p/package/'
+                        'package_1.0.0.dsc')
         expected_content = 'This is fake content'
         mock_get_resource_content.return_value = \
             expected_content.encode('utf-8')
@@ -656,6 +665,36 @@ class GenerateNewsFromRepositoryUpdatesTest(TestCase):
         self.assertEqual(1, News.objects.count())
         news = News.objects.all()[0]
         self.assertEqual(news.content, expected_content)
+        # The dsc file was fetched ahead of the news generation
+        mock_http_cache.return_value.prefetch.assert_called_once_with(
+            [dsc_file_url])
+        mock_get_resource_content.assert_called_once_with(dsc_file_url)
+
+    @mock.patch('distro_tracker.auto_news.tracker_tasks.HttpCache')
+    @mock.patch('distro_tracker.auto_news.tracker_tasks.get_resource_content')
+    def test_dsc_file_prefetched_once_per_version(
+            self, mock_get_resource_content, mock_http_cache):
+        """
+        Tests that only the dsc file used in the content of the news is
+        fetched ahead when a new version appears in several repositories.
+        """
+        name = 'package'
+        version = '1.0.0'
+        repositories = ['repo1', 'repo2']
+        src_pkg = self.create_source_package(name, version)
+        src_pkg.directory = 'pool/main/p/package'
+        src_pkg.dsc_file_name = 'package_1.0.0.dsc'
+        src_pkg.save()
+        for repository in repositories:
+            self.add_source_package_to_repository(name, version, repository)
+            Repository.objects.filter(name=repository).update(
+                uri='http://{}.example.com/debian'.format(repository))
+        mock_get_resource_content.return_value = b''
+
+        self.run_task()
+
+        mock_http_cache.return_value.prefetch.assert_called_once_with(
+            [mock_get_resource_content.call_args_list[0][0][0]])
 
     def test_changelog_entry_in_news_content(self):
         """
@@ -11,9 +11,12 @@
 The Distro-Tracker-specific tasks for :mod:`distro_tracker.auto_news` app.
 """
 from __future__ import unicode_literals
+from django.conf import settings
 from distro_tracker.core.tasks import BaseTask
+from distro_tracker.core.utils.http import HttpCache
 from distro_tracker.core.utils.http import get_resource_content
 from distro_tracker.core.models import SourcePackageName
+from distro_tracker.core.models import SourcePackage
 from distro_tracker.core.models import Repository
 from distro_tracker.core.models import News
 
@@ -40,7 +43,9 @@ class GenerateNewsFromRepositoryUpdates(BaseTask):
         entry = package_version.repository_entries.all()[0]
 
         # Add dsc file
-        content = get_resource_content(entry.dsc_file_url)
+        content = None
+        if entry.dsc_file_url:
+            content = get_resource_content(entry.dsc_file_url)
         if content:
             content = content.decode('utf-8')
         else:
@@ -112,6 +117,35 @@ class GenerateNewsFromRepositoryUpdates(BaseTask):
                 self._process_package_event(package, event, repository,
                                             new_source_version)
 
+    def prefetch_dsc_files(self, new_source_versions):
+        """
+        Fetches concurrently the dsc files of the new source package versions,
+        which are included in the content of the news.
+        """
+        # The news content uses the dsc file of the first repository entry
+        package_versions = SourcePackage.objects.filter(
+            source_package_name__name__in=new_source_versions.keys(),
+            version__in=[
+                version
+                for versions in new_source_versions.values()
+                for version in versions
+            ])
+        package_versions = package_versions.select_related(
+            'source_package_name')
+        package_versions = package_versions.prefetch_related(
+            'repository_entries__repository')
+        urls = []
+        for package_version in package_versions:
+            name = package_version.source_package_name.name
+            if package_version.version not in new_source_versions[name]:
+                continue
+            entries = package_version.repository_entries.all()
+            if entries:
+                urls.append(entries[0].dsc_file_url)
+        urls = [url for url in urls if url]
+        if urls:
+            HttpCache(settings.DISTRO_TRACKER_CACHE_DIRECTORY).prefetch(urls)
+
     def execute(self):
         package_changes = {}
         new_source_versions = {}
@@ -128,6 +162,8 @@ class GenerateNewsFromRepositoryUpdates(BaseTask):
             if event.name == 'new-source-package-version':
                 new_source_versions[package_name].append(version)
 
+        self.prefetch_dsc_files(new_source_versions)
+
         # Retrieve all relevant packages from the db
         packages = SourcePackageName.objects.filter(
             name__in=package_changes.keys())
@@ -0,0 +1,133 @@
+# Copyright 2016 The Distro Tracker Developers
+# See the COPYRIGHT file at the top-level directory of this distribution and
+# at https://deb.li/DTAuthors
+#
+# This file is part of Distro Tracker. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this
+# distribution and at https://deb.li/DTLicense. No part of Distro Tracker,
+# including this file, may be copied, modified, propagated, or distributed
+# except according to the terms contained in the LICENSE file.
+"""
+Routing of the read-only code paths to read replicas of the database.
+
+The replicas are the database aliases listed in the
+:data:`DISTRO_TRACKER_DATABASE_REPLICAS
+<distro_tracker.project.settings.DISTRO_TRACKER_DATABASE_REPLICAS>` setting.
+Reads are only sent to them from code wrapped with :class:`read_replicas`,
+and never during the
+:data:`DISTRO_TRACKER_DATABASE_REPLICA_STICKY_SECONDS
+<distro_tracker.project.settings.DISTRO_TRACKER_DATABASE_REPLICA_STICKY_SECONDS>`
+seconds following a write, so that a client always sees its own changes even
+if the replicas lag behind the primary database.
+"""
+from __future__ import unicode_literals
+from functools import wraps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+import random
+import threading
+import time
+
+_state = threading.local()
+
+#: The name of the cookie keeping the clients which made changes on the
+#: primary database
+STICKY_COOKIE_NAME = 'distro_tracker_primary_db_until'
+
+
+def _get_replicas():
+    return getattr(settings, 'DISTRO_TRACKER_DATABASE_REPLICAS', [])
+
+
+def _get_sticky_seconds():
+    return getattr(
+        settings, 'DISTRO_TRACKER_DATABASE_REPLICA_STICKY_SECONDS', 15)
+
+
+def use_primary_until(timestamp):
+    """
+    Forces the current thread to read from the primary database until the
+    given time.
+
+    :param timestamp: A Unix timestamp
+    :type timestamp: float
+    """
+    _state.primary_until = max(getattr(_state, 'primary_until', 0), timestamp)
+
+
+class read_replicas(object):
+    """
+    A context manager (which can also be used as a decorator) marking a code
+    path as read-only, allowing the :class:`ReadReplicaRouter` to send its
+    queries to a read replica.
+    """
+    def __enter__(self):
+        _state.depth = getattr(_state, 'depth', 0) + 1
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _state.depth -= 1
+
+    def __call__(self, function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with read_replicas():
+                return function(*args, **kwargs)
+        return wrapper
+
+
+class ReadReplicaRouter(object):
+    """
+    A database router sending the reads of read-only code paths to a
+    randomly selected read replica. All writes go to the default database.
+
+    The router does nothing when no replica is configured.
+    """
+    def db_for_read(self, model, **hints):
+        replicas = _get_replicas()
+        if not replicas or not getattr(_state, 'depth', 0):
+            return None
+        if time.time() < getattr(_state, 'primary_until', 0):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if not _get_replicas():
+            return None
+        use_primary_until(time.time() + _get_sticky_seconds())
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas hold the same data as the primary database
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in _get_replicas():
+            return False
+        return None
+
+
+class ReadReplicaMiddleware(object):
+    """
+    A middleware keeping the clients which have made changes (using any
+    other HTTP method than GET, HEAD or OPTIONS) on the primary database for
+    a few seconds, by the means of a cookie.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def process_request(self, request):
+        _state.primary_until = 0
+        try:
+            timestamp = float(request.COOKIES.get(STICKY_COOKIE_NAME, 0))
+        except ValueError:
+            return
+        use_primary_until(timestamp)
+
+    def process_response(self, request, response):
+        if _get_replicas() and request.method not in self.SAFE_METHODS:
+            sticky_seconds = _get_sticky_seconds()
+            response.set_cookie(
+                STICKY_COOKIE_NAME,
+                str(time.time() + sticky_seconds),
+                max_age=sticky_seconds)
+        return response
@@ -0,0 +1,87 @@
+# Copyright 2013-2016 The Distro Tracker Developers
+# See the COPYRIGHT file at the top-level directory of this distribution and
+# at https://deb.li/DTAuthors
+#
+# This file is part of Distro Tracker. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this
+# distribution and at https://deb.li/DTLicense. No part of Distro Tracker,
+# including this file, may be copied, modified, propagated, or distributed
+# except according to the terms contained in the LICENSE file.
+"""
+Implements a command to inspect and prune the cache of Web resources.
+"""
+from __future__ import unicode_literals
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from distro_tracker.core.utils.http import HttpCache
+
+import datetime
+
+
+class Command(BaseCommand):
+    """
+    A Django management command which displays the content of the
+    :class:`HttpCache <distro_tracker.core.utils.http.HttpCache>` and removes
+    its least recently used responses.
+    """
+    help = ("Display the content of the cache of Web resources and remove"
+            " its least recently used resources")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            dest='list',
+            default=False,
+            help='List all cached resources, the least recently used first.'
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            dest='prune',
+            default=False,
+            help=(
+                'Remove the least recently used resources until the cache'
+                ' is smaller than its maximum size.'
+            )
+        )
+        parser.add_argument(
+            '--max-size',
+            type=int,
+            dest='max_size',
+            default=None,
+            help=(
+                'The maximum size of the cache in bytes, instead of the'
+                ' DISTRO_TRACKER_HTTP_CACHE_MAX_SIZE setting.'
+            )
+        )
+
+    def format_timestamp(self, timestamp):
+        return datetime.datetime.utcfromtimestamp(timestamp).strftime(
+            '%Y-%m-%d %H:%M:%S')
+
+    def handle(self, *args, **kwargs):
+        cache = HttpCache(settings.DISTRO_TRACKER_CACHE_DIRECTORY)
+
+        if kwargs['prune']:
+            removed = cache.prune(max_size=kwargs['max_size'])
+            self.stdout.write('Removed {} resource(s).'.format(removed))
+
+        entries = cache.index.all()
+        if kwargs['list']:
+            for entry in entries:
+                self.stdout.write(
+                    '{size:>12} {fetched} {accessed} {url}'.format(
+                        size=entry.size,
+                        fetched=self.format_timestamp(entry.fetched),
+                        accessed=self.format_timestamp(entry.accessed),
+                        url=entry.url))
+
+        max_size = kwargs['max_size']
+        if max_size is None:
+            max_size = getattr(settings, 'DISTRO_TRACKER_HTTP_CACHE_MAX_SIZE',
+                               None)
+        self.stdout.write('{count} resource(s), {size} bytes (maximum: {max})'
+                          .format(count=len(entries),
+                                  size=sum(entry.size for entry in entries),
+                                  max='none' if max_size is None else max_size))
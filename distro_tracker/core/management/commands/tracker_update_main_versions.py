@@ -0,0 +1,36 @@
+# Copyright 2013-2016 The Distro Tracker Developers
+# See the COPYRIGHT file at the top-level directory of this distribution and
+# at https://deb.li/DTAuthors
+#
+# This file is part of Distro Tracker. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this
+# distribution and at https://deb.li/DTLicense. No part of Distro Tracker,
+# including this file, may be copied, modified, propagated, or distributed
+# except according to the terms contained in the LICENSE file.
+"""
+Implements a command to recompute the main version of all source packages.
+"""
+from __future__ import unicode_literals
+from django.core.management.base import BaseCommand
+from distro_tracker.core.models import SourcePackageName
+
+
+class Command(BaseCommand):
+    """
+    A Django management command which recomputes the denormalized main
+    version and main repository entry of all source packages.
+
+    It must be run after the default repository has been changed.
+    """
+    help = ("Recompute the main version and main repository entry of all"
+            " source packages (needed after changing the default repository)")
+
+    def handle(self, *args, **kwargs):
+        verbose = int(kwargs['verbosity']) > 1
+        if verbose:
+            self.stdout.write('Updating the main versions of all packages...')
+
+        SourcePackageName.objects.update_main_versions()
+
+        if verbose:
+            self.stdout.write('Done.')
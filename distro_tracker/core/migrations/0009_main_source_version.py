@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_drop-release-goals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='packagename',
+            name='main_source_entry',
+            field=models.ForeignKey(
+                blank=True, null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+', to='core.SourcePackageRepositoryEntry'),
+        ),
+        migrations.AddField(
+            model_name='packagename',
+            name='main_source_version',
+            field=models.ForeignKey(
+                blank=True, null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+', to='core.SourcePackage'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+from distro_tracker.core.utils.packages import version_sort_key
+
+
+def fill_version_keys(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    for model_name in ('SourcePackage', 'BinaryPackage'):
+        Model = apps.get_model('core', model_name)
+        qs = Model.objects.using(db_alias).values_list('id', 'version')
+        for pk, version in qs.iterator():
+            Model.objects.using(db_alias).filter(pk=pk).update(
+                version_key=version_sort_key(version))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_main_source_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='binarypackage',
+            name='version_key',
+            field=models.CharField(blank=True, db_index=True, max_length=512),
+        ),
+        migrations.AddField(
+            model_name='sourcepackage',
+            name='version_key',
+            field=models.CharField(blank=True, db_index=True, max_length=512),
+        ),
+        migrations.RunPython(
+            fill_version_keys,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+import distro_tracker.core.utils.jsonb
+from distro_tracker.core.utils.jsonb import convert_from_jsonb
+from distro_tracker.core.utils.jsonb import convert_to_jsonb
+from distro_tracker.core.utils.jsonb import create_gin_index
+from distro_tracker.core.utils.jsonb import drop_gin_index
+
+GIN_INDEXES = (
+    ('core_packageextractedinfo', 'value'),
+    ('core_actionitem', 'extra_data'),
+)
+
+
+def forwards(apps, schema_editor):
+    convert_to_jsonb(apps, schema_editor, 'core')
+    for table, column in GIN_INDEXES:
+        create_gin_index(schema_editor, table, column)
+
+
+def backwards(apps, schema_editor):
+    for table, column in GIN_INDEXES:
+        drop_gin_index(schema_editor, table, column)
+    convert_from_jsonb(apps, schema_editor, 'core')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_version_key'),
+    ]
+
+    operations = [
+        # The columns are converted by forwards(), which handles the empty
+        # strings that cannot be cast to jsonb
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='actionitem',
+                name='extra_data',
+                field=distro_tracker.core.utils.jsonb.JSONField(
+                    blank=True, null=True),
+            ),
+            migrations.AlterField(
+                model_name='binarypackagebugstats',
+                name='stats',
+                field=distro_tracker.core.utils.jsonb.JSONField(
+                    blank=True, default=dict),
+            ),
+            migrations.AlterField(
+                model_name='packagebugstats',
+                name='stats',
+                field=distro_tracker.core.utils.jsonb.JSONField(
+                    blank=True, default=dict),
+            ),
+            migrations.AlterField(
+                model_name='packageextractedinfo',
+                name='value',
+                field=distro_tracker.core.utils.jsonb.JSONField(default=dict),
+            ),
+            migrations.AlterField(
+                model_name='runningjob',
+                name='additional_parameters',
+                field=distro_tracker.core.utils.jsonb.JSONField(null=True),
+            ),
+            migrations.AlterField(
+                model_name='runningjob',
+                name='state',
+                field=distro_tracker.core.utils.jsonb.JSONField(null=True),
+            ),
+            migrations.AlterField(
+                model_name='sourcepackage',
+                name='vcs',
+                field=distro_tracker.core.utils.jsonb.JSONField(default=dict),
+            ),
+            migrations.AlterField(
+                model_name='sourcepackagedeps',
+                name='details',
+                field=distro_tracker.core.utils.jsonb.JSONField(default=dict),
+            ),
+        ]),
+        migrations.RunPython(forwards, backwards),
+    ]
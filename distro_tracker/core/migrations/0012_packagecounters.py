@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_jsonb'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PackageCounters',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subscriber_count', models.PositiveIntegerField(db_index=True, default=0)),
+                ('wishlist_action_items', models.PositiveIntegerField(default=0)),
+                ('low_action_items', models.PositiveIntegerField(default=0)),
+                ('normal_action_items', models.PositiveIntegerField(default=0)),
+                ('high_action_items', models.PositiveIntegerField(default=0)),
+                ('critical_action_items', models.PositiveIntegerField(default=0)),
+                ('highest_severity', models.IntegerField(choices=[(0, 'wishlist'), (1, 'low'), (2, 'normal'), (3, 'high'), (4, 'critical')], db_index=True, null=True)),
+                ('latest_news_timestamp', models.DateTimeField(db_index=True, null=True)),
+                ('package', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='counters', to='core.PackageName')),
+            ],
+        ),
+    ]
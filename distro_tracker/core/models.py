@@ -12,17 +12,19 @@ from __future__ import unicode_literals
 from email.utils import getaddresses
 from email.utils import parseaddr
 from email.iterators import typed_subpart_iterator
-from jsonfield import JSONField
+from distro_tracker.core.utils.jsonb import JSONField
 import os
 import hashlib
+import collections
 import string
 import random
 import re
 
-from debian.debian_support import AptPkgVersion
 from debian import changelog as debian_changelog
 from django.core.exceptions import ValidationError
+from django.db import connections
 from django.db import models
+from django.db import transaction
 from django.db.utils import IntegrityError
 from django.utils import six
 from django.utils import timezone
@@ -37,6 +39,7 @@ from django.core.files.base import ContentFile
 from django.template.defaultfilters import slugify
 from django_email_accounts.models import UserEmail
 from distro_tracker.core.utils import get_or_none
+from distro_tracker.core.utils import get_data_checksum
 from distro_tracker.core.utils import SpaceDelimitedTextField
 from distro_tracker.core.utils import verify_signature
 from distro_tracker.core.utils import distro_tracker_render_to_string
@@ -45,6 +48,7 @@ from distro_tracker.core.utils.email_messages import decode_header
 from distro_tracker.core.utils.email_messages import get_decoded_message_payload
 from distro_tracker.core.utils.email_messages import message_from_bytes
 from distro_tracker.core.utils.packages import package_hashdir
+from distro_tracker.core.utils.packages import version_sort_key
 from distro_tracker.core.utils.linkify import linkify
 
 DISTRO_TRACKER_CONFIRMATION_EXPIRATION_DAYS = \
@@ -228,6 +232,112 @@ class PackageManager(models.Manager):
         """
         return self.get(name=package_name)
 
+    def invalidate_main_versions(self, package_ids):
+        """
+        Clears the denormalized main version and main entry pointers of the
+        source packages with the given IDs so that they get recomputed by the
+        next call to :meth:`update_main_versions`.
+
+        :param package_ids: The IDs of the :class:`PackageName` instances.
+        :type package_ids: iterable of integers
+        """
+        PackageName.default_manager.filter(id__in=package_ids).update(
+            main_source_version=None,
+            main_source_entry=None)
+
+    def update_main_versions(self, only_outdated=False):
+        """
+        Recomputes the denormalized :attr:`main_source_version
+        <PackageName.main_source_version>` and :attr:`main_source_entry
+        <PackageName.main_source_entry>` pointers of all source packages.
+
+        All versions and repository entries are loaded in a few queries and
+        only the packages whose pointers have changed are updated.
+
+        :param only_outdated: If ``True``, only the packages which do not
+            have both pointers set are processed.
+        :type only_outdated: bool
+        """
+        qs = PackageName.default_manager.filter(source=True)
+        if only_outdated:
+            outdated = models.Q(main_source_version__isnull=True)
+            outdated |= models.Q(main_source_entry__isnull=True)
+            qs = qs.filter(outdated)
+        current = {
+            package_id: (version_id, entry_id)
+            for package_id, version_id, entry_id in qs.values_list(
+                'id', 'main_source_version_id', 'main_source_entry_id')
+        }
+
+        package_ids = list(current.keys())
+        chunk_size = 500
+        for start in range(0, len(package_ids), chunk_size):
+            chunk = package_ids[start:start + chunk_size]
+            versions = {}
+            for source_package in SourcePackage.objects.filter(
+                    source_package_name_id__in=chunk).only(
+                        'id', 'version_key', 'source_package_name'):
+                versions.setdefault(
+                    source_package.source_package_name_id, []).append(
+                        source_package)
+            entries = {}
+            qs = SourcePackageRepositoryEntry.objects.filter(
+                source_package__source_package_name_id__in=chunk)
+            for entry in qs.select_related('source_package', 'repository'):
+                entries.setdefault(
+                    entry.source_package.source_package_name_id, []).append(
+                        entry)
+
+            for package_id in chunk:
+                main_version, main_entry = find_main_version_and_entry(
+                    versions.get(package_id, []),
+                    entries.get(package_id, []))
+                new = (
+                    main_version.id if main_version else None,
+                    main_entry.id if main_entry else None,
+                )
+                if new == current[package_id]:
+                    continue
+                PackageName.default_manager.filter(id=package_id).update(
+                    main_source_version_id=new[0],
+                    main_source_entry_id=new[1])
+
+
+def find_main_version_and_entry(versions, entries):
+    """
+    Finds the main version and the main repository entry of a source package
+    among the given candidates.
+
+    The main entry is the entry with the highest version in the default
+    repository or, if the package is not found in the default repository,
+    the entry with the highest version overall. The main version is selected
+    in the same way among all versions of the package.
+
+    :param versions: All :class:`SourcePackage` instances of a package.
+    :param entries: All :class:`SourcePackageRepositoryEntry` instances of
+        the package, with their ``source_package`` and ``repository``
+        already loaded.
+
+    :returns: A ``(main_version, main_entry)`` pair. Any of the two can be
+        ``None`` if there is no candidate.
+    """
+    default_entries = [
+        entry for entry in entries if entry.repository.default
+    ]
+    if default_entries:
+        entries = default_entries
+        versions = [entry.source_package for entry in default_entries]
+
+    main_version = None
+    if versions:
+        main_version = max(versions, key=lambda x: x.version_key)
+    main_entry = None
+    if entries:
+        main_entry = max(
+            entries, key=lambda x: x.source_package.version_key)
+
+    return main_version, main_entry
+
 
 @python_2_unicode_compatible
 class PackageName(models.Model):
@@ -251,6 +361,25 @@ class PackageName(models.Model):
     subscriptions = models.ManyToManyField(EmailSettings,
                                            through='Subscription')
 
+    #: Denormalized pointer to the :attr:`main_version
+    #: <SourcePackageName.main_version>` of a source package.
+    #: It is maintained by :meth:`PackageManager.update_main_versions`.
+    main_source_version = models.ForeignKey(
+        'SourcePackage',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+')
+    #: Denormalized pointer to the :attr:`main_entry
+    #: <SourcePackageName.main_entry>` of a source package.
+    #: It is maintained by :meth:`PackageManager.update_main_versions`.
+    main_source_entry = models.ForeignKey(
+        'SourcePackageRepositoryEntry',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+')
+
     objects = PackageManager()
     source_packages = PackageManager('source')
     binary_packages = PackageManager('binary')
@@ -375,8 +504,8 @@ class BinaryPackageName(PackageName):
         else:
             qs = self.sourcepackage_set.all()
 
-        if qs.exists():
-            source_package = max(qs, key=lambda x: AptPkgVersion(x.version))
+        source_package = qs.order_by('-version_key').first()
+        if source_package is not None:
             return source_package.source_package_name
         else:
             return None
@@ -403,7 +532,16 @@ class SourcePackageName(PackageName):
         It is defined as either the highest version found in the default
         repository, or if the package is not found in the default repository at
         all, the highest available version.
+
+        The value stored in :attr:`main_source_version
+        <PackageName.main_source_version>` is used when available, otherwise
+        it is computed from the existing versions.
         """
+        if self.main_source_version_id and self.main_source_entry_id:
+            return self.main_source_version
+        return self._compute_main_version()
+
+    def _compute_main_version(self):
         default_repository_qs = self.source_package_versions.filter(
             repository_entries__repository__default=True)
         if default_repository_qs.exists():
@@ -411,11 +549,7 @@ class SourcePackageName(PackageName):
         else:
             qs = self.source_package_versions.all()
 
-        qs.select_related()
-        try:
-            return max(qs, key=lambda x: AptPkgVersion(x.version))
-        except ValueError:
-            return None
+        return qs.order_by('-version_key').first()
 
     @cached_property
     def main_entry(self):
@@ -424,7 +558,16 @@ class SourcePackageName(PackageName):
         package's entry in either the default repository (if the package is
         found there) or in the first repository (as defined by the repository
         order) which has the highest available package version.
+
+        The value stored in :attr:`main_source_entry
+        <PackageName.main_source_entry>` is used when available, otherwise
+        it is computed from the existing entries.
         """
+        if self.main_source_version_id and self.main_source_entry_id:
+            return self.main_source_entry
+        return self._compute_main_entry()
+
+    def _compute_main_entry(self):
         default_repository_qs = SourcePackageRepositoryEntry.objects.filter(
             repository__default=True,
             source_package__source_package_name=self
@@ -436,13 +579,7 @@ class SourcePackageName(PackageName):
                 source_package__source_package_name=self)
 
         qs = qs.select_related()
-        try:
-            return max(
-                qs,
-                key=lambda x: AptPkgVersion(x.source_package.version)
-            )
-        except ValueError:
-            return None
+        return qs.order_by('-source_package__version_key').first()
 
     @cached_property
     def repositories(self):
@@ -830,12 +967,7 @@ class Repository(models.Model):
         qs = self.source_entries.filter(
             source_package__source_package_name__name=package_name)
         qs = qs.select_related()
-        try:
-            return max(
-                qs,
-                key=lambda x: AptPkgVersion(x.source_package.version))
-        except ValueError:
-            return None
+        return qs.order_by('-source_package__version_key').first()
 
     def add_source_package(self, package, **kwargs):
         """
@@ -1073,6 +1205,10 @@ class SourcePackage(models.Model):
         SourcePackageName,
         related_name='source_package_versions')
     version = models.CharField(max_length=100)
+    #: A key sorting in the same order as the Debian versions, computed
+    #: from :attr:`version` by :func:`version_sort_key
+    #: <distro_tracker.core.utils.packages.version_sort_key>`.
+    version_key = models.CharField(max_length=512, blank=True, db_index=True)
 
     standards_version = models.CharField(max_length=550, blank=True)
     architectures = models.ManyToManyField(Architecture, blank=True)
@@ -1095,6 +1231,15 @@ class SourcePackage(models.Model):
     class Meta:
         unique_together = ('source_package_name', 'version')
 
+    def save(self, *args, **kwargs):
+        self.version_key = version_sort_key(self.version)
+        new_object = not self.id
+        super(SourcePackage, self).save(*args, **kwargs)
+        if new_object:
+            # A new version can change the main version of the package
+            SourcePackageName.objects.invalidate_main_versions(
+                [self.source_package_name_id])
+
     def __str__(self):
         return '{pkg}, version {ver}'.format(
             pkg=self.source_package_name, ver=self.version)
@@ -1198,6 +1343,10 @@ class BinaryPackage(models.Model):
         related_name='binary_package_versions'
     )
     version = models.CharField(max_length=100)
+    #: A key sorting in the same order as the Debian versions, computed
+    #: from :attr:`version` by :func:`version_sort_key
+    #: <distro_tracker.core.utils.packages.version_sort_key>`.
+    version_key = models.CharField(max_length=512, blank=True, db_index=True)
     source_package = models.ForeignKey(SourcePackage)
 
     short_description = models.CharField(max_length=300, blank=True)
@@ -1206,6 +1355,10 @@ class BinaryPackage(models.Model):
     class Meta:
         unique_together = ('binary_package_name', 'version')
 
+    def save(self, *args, **kwargs):
+        self.version_key = version_sort_key(self.version)
+        super(BinaryPackage, self).save(*args, **kwargs)
+
     def __str__(self):
         return 'Binary package {pkg}, version {ver}'.format(
             pkg=self.binary_package_name, ver=self.version)
@@ -1312,6 +1465,14 @@ class SourcePackageRepositoryEntry(models.Model):
     class Meta:
         unique_together = ('source_package', 'repository')
 
+    def save(self, *args, **kwargs):
+        new_object = not self.id
+        super(SourcePackageRepositoryEntry, self).save(*args, **kwargs)
+        if new_object:
+            # A new entry can change the main entry of the package
+            SourcePackageName.objects.invalidate_main_versions(
+                [self.source_package.source_package_name_id])
+
     def __str__(self):
         return "Source package {pkg} in the repository {repo}".format(
             pkg=self.source_package,
@@ -1392,6 +1553,123 @@ class ExtractedSourceFile(models.Model):
             extracted_file=self.extracted_file, package=self.source_package)
 
 
+class PackageExtractedInfoManager(models.Manager):
+    """
+    A custom :class:`Manager <django.db.models.Manager>` for the
+    :class:`PackageExtractedInfo` model.
+    """
+    #: The number of rows written by a single query
+    CHUNK_SIZE = 500
+
+    def bulk_upsert(self, key, values, delete_missing=False):
+        """
+        Stores the extracted information with the given key for many packages
+        at once.
+
+        Within a single transaction, missing rows are inserted and existing
+        rows are updated only when their value has changed (as detected by
+        comparing the checksums of the old and new values).
+
+        :param key: The key of the extracted information.
+        :type key: string
+        :param values: Maps :class:`PackageName` IDs to the value to store.
+        :type values: dict
+        :param delete_missing: If ``True``, the rows with the given key for
+            packages not found in ``values`` are deleted.
+        :type delete_missing: bool
+        """
+        with transaction.atomic(using=self.db):
+            existing = {
+                package_id: (row_id, get_data_checksum(value))
+                for row_id, package_id, value in self._existing_rows(
+                    key, None if delete_missing else list(values))
+            }
+
+            to_write = []
+            for package_id, value in six.iteritems(values):
+                if package_id in existing:
+                    _, checksum = existing[package_id]
+                    if checksum == get_data_checksum(value):
+                        continue
+                to_write.append((package_id, value))
+
+            if delete_missing:
+                obsolete = [
+                    row_id
+                    for package_id, (row_id, _) in six.iteritems(existing)
+                    if package_id not in values
+                ]
+                for start in range(0, len(obsolete), self.CHUNK_SIZE):
+                    self.filter(
+                        id__in=obsolete[start:start + self.CHUNK_SIZE]
+                    ).delete()
+
+            connection = connections[self.db]
+            if connection.vendor == 'postgresql' \
+                    and connection.pg_version >= 90500:
+                self._upsert_native(connection, key, to_write)
+                return
+
+            to_create = [
+                PackageExtractedInfo(key=key, package_id=package_id,
+                                     value=value)
+                for package_id, value in to_write
+                if package_id not in existing
+            ]
+            self.bulk_create(to_create, batch_size=self.CHUNK_SIZE)
+            for package_id, value in to_write:
+                if package_id in existing:
+                    row_id, _ = existing[package_id]
+                    self.filter(id=row_id).update(value=value)
+
+    def _existing_rows(self, key, package_ids=None):
+        """
+        Yields the ``(id, package_id, value)`` tuples of the rows with the
+        given key.
+
+        When ``package_ids`` is given, only the rows of those packages are
+        loaded, :attr:`CHUNK_SIZE` packages at a time. Otherwise, all the rows
+        of the key are loaded.
+        """
+        fields = ('id', 'package_id', 'value')
+        if package_ids is None:
+            for row in self.filter(key=key).values_list(*fields):
+                yield row
+            return
+
+        for start in range(0, len(package_ids), self.CHUNK_SIZE):
+            chunk = package_ids[start:start + self.CHUNK_SIZE]
+            for row in self.filter(
+                    key=key, package_id__in=chunk).values_list(*fields):
+                yield row
+
+    def _upsert_native(self, connection, key, rows):
+        """
+        Writes the given ``(package_id, value)`` rows with PostgreSQL's
+        ``INSERT ... ON CONFLICT`` statement.
+        """
+        value_field = self.model._meta.get_field('value')
+        sql = (
+            'INSERT INTO {table} (key, package_id, value) VALUES {values} '
+            'ON CONFLICT (key, package_id) '
+            'DO UPDATE SET value = EXCLUDED.value'
+        )
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), self.CHUNK_SIZE):
+                chunk = rows[start:start + self.CHUNK_SIZE]
+                params = []
+                for package_id, value in chunk:
+                    params.extend([
+                        key,
+                        package_id,
+                        value_field.get_db_prep_save(value, connection),
+                    ])
+                cursor.execute(sql.format(
+                    table=connection.ops.quote_name(self.model._meta.db_table),
+                    values=', '.join(['(%s, %s, %s)'] * len(chunk))
+                ), params)
+
+
 @python_2_unicode_compatible
 class PackageExtractedInfo(models.Model):
     """
@@ -1403,6 +1681,8 @@ class PackageExtractedInfo(models.Model):
     key = models.CharField(max_length=50)
     value = JSONField()
 
+    objects = PackageExtractedInfoManager()
+
     def __str__(self):
         return '{key}: {value} for package {package}'.format(
             key=self.key, value=self.value, package=self.package)
@@ -1851,6 +2131,86 @@ class EmailNewsRenderer(NewsRenderer):
         }
 
 
+class PackageDataManager(models.Manager):
+    """
+    A custom :class:`Manager <django.db.models.Manager>` for the models
+    storing some data (in a :class:`JSONField
+    <distro_tracker.core.utils.jsonb.JSONField>`) for each package, such as
+    :class:`PackageBugStats`.
+
+    :param data_field: The name of the field holding the data, or a tuple of
+        the names of the fields holding it. In the latter case, the data of
+        a package is a dict mapping the names of the fields to their value.
+    """
+    #: The number of rows read or written by a single query
+    CHUNK_SIZE = 500
+
+    def __init__(self, data_field='stats', *args, **kwargs):
+        super(PackageDataManager, self).__init__(*args, **kwargs)
+        self.data_field = data_field
+
+    @property
+    def data_fields(self):
+        if isinstance(self.data_field, six.string_types):
+            return (self.data_field,)
+        return tuple(self.data_field)
+
+    def _get_field_values(self, data):
+        """
+        :returns: A dict mapping the names of the data fields to their value
+            in the given data.
+        """
+        if isinstance(self.data_field, six.string_types):
+            return {self.data_field: data}
+        return {field: data.get(field) for field in self.data_fields}
+
+    def sync(self, values):
+        """
+        Makes the stored data match the given data, touching only the rows
+        which need it: within a single transaction, the rows of new packages
+        are inserted in bulk, the rows whose data has changed (as detected by
+        comparing the checksums of the old and new data) are updated and the
+        rows of the packages not found in ``values`` are deleted.
+
+        :param values: Maps the IDs of the packages to their data.
+        :type values: dict
+
+        :returns: The numbers of created, updated and deleted rows.
+        :rtype: tuple
+        """
+        data_fields = self.data_fields
+        with transaction.atomic(using=self.db):
+            existing = {}
+            for row in self.values_list(
+                    'id', 'package_id', *data_fields).iterator():
+                row_id, package_id = row[:2]
+                field_values = dict(zip(data_fields, row[2:]))
+                existing[package_id] = (
+                    row_id, get_data_checksum(field_values))
+
+            to_create = []
+            to_update = []
+            for package_id, data in six.iteritems(values):
+                field_values = self._get_field_values(data)
+                if package_id not in existing:
+                    to_create.append(
+                        self.model(package_id=package_id, **field_values))
+                    continue
+                row_id, checksum = existing.pop(package_id)
+                if checksum != get_data_checksum(field_values):
+                    to_update.append((row_id, field_values))
+
+            self.bulk_create(to_create, batch_size=self.CHUNK_SIZE)
+            for row_id, field_values in to_update:
+                self.filter(id=row_id).update(**field_values)
+            obsolete = [row_id for row_id, _ in existing.values()]
+            for start in range(0, len(obsolete), self.CHUNK_SIZE):
+                self.filter(
+                    id__in=obsolete[start:start + self.CHUNK_SIZE]).delete()
+
+        return len(to_create), len(to_update), len(obsolete)
+
+
 @python_2_unicode_compatible
 class PackageBugStats(models.Model):
     """
@@ -1860,6 +2220,8 @@ class PackageBugStats(models.Model):
     package = models.OneToOneField(PackageName, related_name='bug_stats')
     stats = JSONField(blank=True)
 
+    objects = PackageDataManager()
+
     def __str__(self):
         return '{package} bug stats: {stats}'.format(
             package=self.package, stats=self.stats)
@@ -1874,6 +2236,8 @@ class BinaryPackageBugStats(models.Model):
                                    related_name='binary_bug_stats')
     stats = JSONField(blank=True)
 
+    objects = PackageDataManager()
+
     def __str__(self):
         return '{package} bug stats: {stats}'.format(
             package=self.package, stats=self.stats)
@@ -1929,6 +2293,9 @@ class ActionItemManager(models.Manager):
     A custom :class:`Manager <django.db.models.Manager>` for the
     :class:`ActionItem` model.
     """
+    #: The number of rows read or written by a single query
+    CHUNK_SIZE = 500
+
     def delete_obsolete_items(self, item_types, non_obsolete_packages):
         """
         The method removes :class:`ActionItem` instances which have one of the
@@ -1948,6 +2315,91 @@ class ActionItemManager(models.Manager):
         qs = qs.exclude(package__name__in=non_obsolete_packages)
         qs.delete()
 
+    def reconcile(self, item_type, items, packages=None, key=None):
+        """
+        Makes the action items of the given type match the given data with a
+        constant number of queries: the existing items are loaded at once and
+        compared in memory, then the missing items are created in bulk, only
+        the changed items are updated and the obsolete items are deleted
+        together.
+
+        :param item_type: The type of the action items.
+        :type item_type: :class:`ActionItemType`
+        :param items: Maps the names of the packages which need an action item
+            of the given type to a ``(severity, short_description,
+            extra_data)`` tuple. The items of the packages not found in the
+            mapping are deleted.
+        :type items: dict
+        :param packages: The packages which can get an action item, as a
+            :class:`QuerySet <django.db.models.query.QuerySet>` or a manager
+            of :class:`PackageName` (or one of its proxy models). Defaults to
+            all of them.
+        :param key: A function returning, from the ``extra_data`` of an
+            action item, the value which is compared to find out whether an
+            existing item needs to be updated. By default, the severity, the
+            short description and the extra data are all compared.
+
+        :returns: The numbers of created, updated and deleted action items.
+        :rtype: tuple
+        """
+        if packages is None:
+            packages = PackageName.objects
+        with transaction.atomic(using=self.db):
+            names = list(items)
+            package_ids = {}
+            for start in range(0, len(names), self.CHUNK_SIZE):
+                package_ids.update(packages.filter(
+                    name__in=names[start:start + self.CHUNK_SIZE]
+                ).values_list('name', 'id'))
+
+            existing = {
+                item.package_id: item
+                for item in self.filter(item_type=item_type)
+            }
+
+            to_create = []
+            to_update = []
+            for name, data in six.iteritems(items):
+                if name not in package_ids:
+                    continue
+                severity, short_description, extra_data = data
+                item = existing.pop(package_ids[name], None)
+                if item is None:
+                    to_create.append(ActionItem(
+                        package_id=package_ids[name],
+                        item_type=item_type,
+                        severity=severity,
+                        short_description=short_description,
+                        extra_data=extra_data))
+                elif self._has_changed(item, data, key):
+                    item.severity = severity
+                    item.short_description = short_description
+                    item.extra_data = extra_data
+                    to_update.append(item)
+
+            self.bulk_create(to_create, batch_size=self.CHUNK_SIZE)
+            for item in to_update:
+                item.save(update_fields=[
+                    'severity',
+                    'short_description',
+                    'extra_data',
+                    'last_updated_timestamp',
+                ])
+            obsolete = [item.id for item in existing.values()]
+            for start in range(0, len(obsolete), self.CHUNK_SIZE):
+                self.filter(
+                    id__in=obsolete[start:start + self.CHUNK_SIZE]).delete()
+
+        return len(to_create), len(to_update), len(obsolete)
+
+    def _has_changed(self, item, data, key):
+        severity, short_description, extra_data = data
+        if key is not None:
+            return key(item.extra_data or {}) != key(extra_data)
+        return (item.severity, item.short_description,
+                get_data_checksum(item.extra_data)) != (
+            severity, short_description, get_data_checksum(extra_data))
+
 
 @python_2_unicode_compatible
 class ActionItem(models.Model):
@@ -2029,6 +2481,125 @@ class ActionItem(models.Model):
         }
 
 
+class PackageCountersManager(models.Manager):
+    """
+    A custom :class:`Manager <django.db.models.Manager>` for the
+    :class:`PackageCounters` model.
+    """
+    CHUNK_SIZE = 500
+
+    #: Maps each severity of :class:`ActionItem` to the counter field
+    SEVERITY_FIELDS = {
+        ActionItem.SEVERITY_WISHLIST: 'wishlist_action_items',
+        ActionItem.SEVERITY_LOW: 'low_action_items',
+        ActionItem.SEVERITY_NORMAL: 'normal_action_items',
+        ActionItem.SEVERITY_HIGH: 'high_action_items',
+        ActionItem.SEVERITY_CRITICAL: 'critical_action_items',
+    }
+
+    def refresh(self):
+        """
+        Recomputes the counters of all packages.
+
+        The counters are computed with a few aggregate queries and only the
+        rows whose values have changed are written.
+        """
+        counters = collections.defaultdict(dict)
+        qs = Subscription.objects.values('package_id').annotate(
+            count=models.Count('id'))
+        for row in qs:
+            counters[row['package_id']]['subscriber_count'] = row['count']
+
+        qs = ActionItem.objects.values('package_id', 'severity').annotate(
+            count=models.Count('id'))
+        for row in qs:
+            package_counters = counters[row['package_id']]
+            field = self.SEVERITY_FIELDS[row['severity']]
+            package_counters[field] = row['count']
+            package_counters['highest_severity'] = max(
+                row['severity'],
+                package_counters.get('highest_severity', row['severity']))
+
+        qs = News.objects.values('package_id').annotate(
+            latest=models.Max('datetime_created'))
+        for row in qs:
+            counters[row['package_id']]['latest_news_timestamp'] = \
+                row['latest']
+
+        fields = ['subscriber_count', 'highest_severity',
+                  'latest_news_timestamp']
+        fields.extend(self.SEVERITY_FIELDS.values())
+        with transaction.atomic(using=self.db):
+            existing = {
+                row['package_id']: row
+                for row in self.values('id', 'package_id', *fields)
+            }
+            to_create = []
+            for package_id, values in six.iteritems(counters):
+                new_values = {
+                    field: values.get(field, self.model._meta.get_field(
+                        field).get_default())
+                    for field in fields
+                }
+                if package_id not in existing:
+                    to_create.append(
+                        self.model(package_id=package_id, **new_values))
+                    continue
+                old_values = existing[package_id]
+                if any(old_values[field] != new_values[field]
+                       for field in fields):
+                    self.filter(id=old_values['id']).update(**new_values)
+
+            obsolete = [
+                row['id']
+                for package_id, row in six.iteritems(existing)
+                if package_id not in counters
+            ]
+            for start in range(0, len(obsolete), self.CHUNK_SIZE):
+                self.filter(
+                    id__in=obsolete[start:start + self.CHUNK_SIZE]
+                ).delete()
+            self.bulk_create(to_create, batch_size=self.CHUNK_SIZE)
+
+
+@python_2_unicode_compatible
+class PackageCounters(models.Model):
+    """
+    Denormalized counters of the objects associated with a package.
+
+    They are recomputed by :meth:`PackageCountersManager.refresh` so that
+    listing pages and statistics do not need to aggregate the related
+    tables. Packages without any subscription, action item or news do not
+    have counters.
+    """
+    package = models.OneToOneField(PackageName, related_name='counters')
+    subscriber_count = models.PositiveIntegerField(default=0, db_index=True)
+    wishlist_action_items = models.PositiveIntegerField(default=0)
+    low_action_items = models.PositiveIntegerField(default=0)
+    normal_action_items = models.PositiveIntegerField(default=0)
+    high_action_items = models.PositiveIntegerField(default=0)
+    critical_action_items = models.PositiveIntegerField(default=0)
+    #: The highest severity of the package's action items, ``None`` if
+    #: there are none.
+    highest_severity = models.IntegerField(
+        choices=ActionItem.SEVERITIES, null=True, db_index=True)
+    latest_news_timestamp = models.DateTimeField(null=True, db_index=True)
+
+    objects = PackageCountersManager()
+
+    def __str__(self):
+        return 'Counters for package {package}'.format(package=self.package)
+
+    @property
+    def action_item_count(self):
+        """
+        The total number of action items of the package.
+        """
+        return sum(
+            getattr(self, field)
+            for field in PackageCountersManager.SEVERITY_FIELDS.values())
+
+
 class ConfirmationException(Exception):
     """
     An exception which is raised when the :py:class:`ConfirmationManager`
@@ -48,8 +48,10 @@ class PackageNewsFeed(Feed):
         item_limit = getattr(settings, 'DISTRO_TRACKER_RSS_ITEM_LIMIT',
                              self._DEFAULT_LIMIT)
 
-        news = obj.news_set.all()
-        action_items = obj.action_items.all()
+        # Only the most recent items of each kind can be part of the feed
+        news = obj.news_set.order_by('-datetime_created')[:item_limit]
+        action_items = obj.action_items.order_by(
+            '-last_updated_timestamp')[:item_limit]
 
         def item_key(item):
             if isinstance(item, ActionItem):
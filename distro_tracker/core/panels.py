@@ -26,7 +26,6 @@ from distro_tracker.core.models import MailingList
 from distro_tracker.core.models import News
 from distro_tracker.core.models import BinaryPackageBugStats
 from distro_tracker.core.templatetags.distro_tracker_extras import octicon
-from debian.debian_support import AptPkgVersion
 from collections import defaultdict
 
 import importlib
@@ -436,10 +435,8 @@ class VersionedLinks(BasePanel):
             return
         # Make sure we display the versions in a version-number increasing
         # order
-        versions = sorted(
-            self.package.source_package_versions.all(),
-            key=lambda x: AptPkgVersion(x.version)
-        )
+        versions = self.package.source_package_versions.order_by(
+            'version_key')
 
         versioned_links = []
         for package in versions:
@@ -18,6 +18,7 @@ from distro_tracker.core.models import ContributorName
 from distro_tracker.core.models import SourcePackage
 from distro_tracker.core.models import Team
 from distro_tracker.core.models import PackageExtractedInfo
+from distro_tracker.core.models import PackageCounters
 from distro_tracker.core.models import BinaryPackageName
 from distro_tracker.core.models import BinaryPackage
 from distro_tracker.core.models import SourcePackageDeps
@@ -36,6 +37,7 @@ from django.db import models
 from debian import deb822
 import re
 import sys
+import collections
 import requests
 import itertools
 import logging
@@ -726,6 +728,13 @@ class UpdateRepositoriesTask(PackageUpdateTask):
 
         return dependency_instances
 
+    def update_main_versions(self):
+        """
+        Updates the denormalized main version and main repository entry of
+        the source packages which were affected by the repository update.
+        """
+        SourcePackageName.objects.update_main_versions(only_outdated=True)
+
     def update_dependencies(self):
         """
         Updates source-to-source package dependencies stemming from
@@ -818,6 +827,8 @@ class UpdateRepositoriesTask(PackageUpdateTask):
         self.update_sources_files(updated_sources)
         self.log("Updating data from Packages files")
         self.update_packages_files(updated_packages)
+        self.log("Updating main versions of source packages")
+        self.update_main_versions()
         self.log("Updating dependencies")
         self.update_dependencies()
 
@@ -872,17 +883,17 @@ class UpdatePackageGeneralInformation(PackageUpdateTask):
                 self.log("Updating general infos of %d packages",
                          len(package_names))
                 qs = SourcePackageName.objects.filter(name__in=package_names)
+            qs = qs.select_related(
+                'main_source_version',
+                'main_source_entry__repository',
+                'main_source_entry__source_package__maintainer')
+            general = {}
             for package in qs:
                 entry = package.main_entry
                 if entry is None:
                     continue
-
-                general, _ = PackageExtractedInfo.objects.get_or_create(
-                    key='general',
-                    package=package
-                )
-                general.value = self._get_info_from_entry(entry)
-                general.save()
+                general[package.id] = self._get_info_from_entry(entry)
+            PackageExtractedInfo.objects.bulk_upsert('general', general)
 
 
 class UpdateVersionInformation(PackageUpdateTask):
@@ -942,12 +953,15 @@ class UpdateVersionInformation(PackageUpdateTask):
                 self.log("Updating versions tables of %d packages",
                          len(package_names))
                 qs = SourcePackageName.objects.filter(name__in=package_names)
-            for package in qs:
-                versions, _ = PackageExtractedInfo.objects.get_or_create(
-                    key='versions',
-                    package=package)
-                versions.value = self._extract_versions_for_package(package)
-                versions.save()
+            qs = qs.select_related(
+                'main_source_version',
+                'main_source_entry__repository',
+                'main_source_entry__source_package')
+            versions = {
+                package.id: self._extract_versions_for_package(package)
+                for package in qs
+            }
+            PackageExtractedInfo.objects.bulk_upsert('versions', versions)
 
 
 class UpdateSourceToBinariesInformation(PackageUpdateTask):
@@ -999,12 +1013,15 @@ class UpdateSourceToBinariesInformation(PackageUpdateTask):
                 qs = SourcePackageName.objects.all()
             else:
                 qs = SourcePackageName.objects.filter(name__in=package_names)
-            for package in qs:
-                binaries, _ = PackageExtractedInfo.objects.get_or_create(
-                    key='binaries',
-                    package=package)
-                binaries.value = self._get_all_binaries(package)
-                binaries.save()
+            qs = qs.select_related(
+                'main_source_version',
+                'main_source_entry__repository',
+                'main_source_entry__source_package')
+            binaries = {
+                package.id: self._get_all_binaries(package)
+                for package in qs
+            }
+            PackageExtractedInfo.objects.bulk_upsert('binaries', binaries)
 
 
 class UpdateTeamPackagesTask(BaseTask):
@@ -1017,22 +1034,17 @@ class UpdateTeamPackagesTask(BaseTask):
         'new-source-package-version-in-repository',
     )
 
-    def add_package_to_maintainer_teams(self, package, maintainer):
+    def get_teams_by_maintainer_email(self):
         """
-        Adds the given package to all the teams where the given maintainer is
-        set as the maintainer email.
-
-        :param package: The package to add to the maintainers teams.
-        :type package: :class:`SourcePackageName
-            <distro_tracker.core.models.SourcePackageName>`
-        :param maintainer: The maintainer to whose teams the package should be
-            added.
-        :type maintainer:
-            :class:`ContributorName <distro_tracker.core.models.UserEmail>`
+        :returns: A dict mapping the ID of each
+            :class:`UserEmail <django_email_accounts.models.UserEmail>` used
+            as a team maintainer email to the list of IDs of those teams.
         """
-        teams = Team.objects.filter(maintainer_email__email=maintainer.email)
-        for team in teams:
-            team.packages.add(package)
+        teams = collections.defaultdict(list)
+        qs = Team.objects.filter(maintainer_email__isnull=False)
+        for team_id, email_id in qs.values_list('id', 'maintainer_email_id'):
+            teams[email_id].append(team_id)
+        return teams
 
     def execute(self):
         # We only need to process the packages which are added to the default
@@ -1048,21 +1060,61 @@ class UpdateTeamPackagesTask(BaseTask):
             for event in self.get_all_events()
             if event.arguments['repository'] == default_repository.name
         }
+        if not package_versions:
+            return
+        teams = self.get_teams_by_maintainer_email()
+        if not teams:
+            return
+
         filters = {
             'repository_entries__repository': default_repository,
             'source_package_name__name__in': package_versions.keys(),
         }
         source_packages = SourcePackage.objects.filter(**filters)
-        source_packages = source_packages.select_related()
-
-        for source_package in source_packages:
-            package_name = source_package.name
-            if source_package.version == package_versions[package_name]:
-                # Add the package to the maintainer's teams packages
-                package = source_package.source_package_name
-                maintainer = source_package.maintainer
-                self.add_package_to_maintainer_teams(package, maintainer)
-
-                # Add the package to all the uploaders' teams packages
-                for uploader in source_package.uploaders.all():
-                    self.add_package_to_maintainer_teams(package, uploader)
+
+        # Compute the (team, package) pairs from the maintainer and the
+        # uploaders of each new version
+        new_versions = {}
+        team_packages = set()
+        qs = source_packages.values_list(
+            'id', 'source_package_name_id', 'source_package_name__name',
+            'version', 'maintainer__contributor_email_id')
+        for source_id, name_id, name, version, email_id in qs:
+            if version != package_versions[name]:
+                continue
+            new_versions[source_id] = name_id
+            for team_id in teams.get(email_id, []):
+                team_packages.add((team_id, name_id))
+
+        Uploaders = SourcePackage.uploaders.through
+        qs = Uploaders.objects.filter(
+            sourcepackage__in=source_packages).values_list(
+                'sourcepackage_id', 'contributorname__contributor_email_id')
+        for source_id, email_id in qs:
+            if source_id not in new_versions:
+                continue
+            for team_id in teams.get(email_id, []):
+                team_packages.add((team_id, new_versions[source_id]))
+
+        if not team_packages:
+            return
+
+        # Add only the packages which are not yet associated to the teams
+        TeamPackages = Team.packages.through
+        existing = TeamPackages.objects.filter(
+            team_id__in=set(team_id for team_id, _ in team_packages))
+        team_packages -= set(
+            existing.values_list('team_id', 'packagename_id'))
+        TeamPackages.objects.bulk_create([
+            TeamPackages(team_id=team_id, packagename_id=package_id)
+            for team_id, package_id in team_packages
+        ])
+
+
+class UpdatePackageCountersTask(BaseTask):
+    """
+    Recomputes the denormalized :class:`PackageCounters
+    <distro_tracker.core.models.PackageCounters>` of all packages.
+    """
+    def execute(self):
+        PackageCounters.objects.refresh()
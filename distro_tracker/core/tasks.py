@@ -16,7 +16,13 @@ automatically.
 from __future__ import unicode_literals
 from distro_tracker.core.utils.plugins import PluginRegistry
 from distro_tracker.core.utils.datastructures import DAG
+from distro_tracker.core.utils.http import HttpCache
+from distro_tracker.core.utils.http import shared_http_session
 from distro_tracker.core.models import RunningJob
+from distro_tracker.core.models import PackageName
+from distro_tracker.core.models import PseudoPackageName
+from distro_tracker.core.models import BinaryPackageName
+from distro_tracker.core.models import SourcePackageName
 from django.utils import six
 from django.conf import settings
 
@@ -45,6 +51,11 @@ class BaseTask(six.with_metaclass(PluginRegistry)):
     in which case only tasks depending on the events which *were* raised are
     initiated afterwards.
 
+    The list :attr:`RESOURCES` gives the URLs of the HTTP resources the task
+    uses. They are fetched concurrently (see :func:`prefetch_task_resources`)
+    before the tasks of a job run, so that the task finds them up to date in
+    the :class:`HttpCache <distro_tracker.core.utils.http.HttpCache>`.
+
     ..note::
       Subclasses of this class are automatically registered when created which
       allows the :class:`BaseTask` to have the full picture of all tasks and
@@ -54,6 +65,7 @@ class BaseTask(six.with_metaclass(PluginRegistry)):
     """
     DEPENDS_ON_EVENTS = ()
     PRODUCES_EVENTS = ()
+    RESOURCES = ()
 
     @classmethod
     def task_name(cls):
@@ -71,6 +83,17 @@ class BaseTask(six.with_metaclass(PluginRegistry)):
         else:
             return cls.__name__
 
+    @classmethod
+    def get_resources(cls):
+        """
+        The classmethod should return the URLs of the HTTP resources used by
+        the task.
+
+        The default value is the :attr:`RESOURCES` class-level attribute.
+        Tasks whose URLs depend on the settings can override this classmethod.
+        """
+        return list(cls.RESOURCES)
+
     def __init__(self, job=None):
         #: A flag signalling whether the task has received any events.
         #: A task with no received events does not need to run.
@@ -78,6 +101,19 @@ class BaseTask(six.with_metaclass(PluginRegistry)):
         self._raised_events = []
         #: A reference to the job to which this task belongs, if any
         self.job = job
+        self._package_names = None
+
+    @property
+    def package_names(self):
+        """
+        The :class:`PackageNameResolver` of the job to which the task belongs,
+        or one private to the task if it runs independently of a job.
+        """
+        if self.job is not None:
+            return self.job.package_names
+        if self._package_names is None:
+            self._package_names = PackageNameResolver()
+        return self._package_names
 
     def is_initial_task(self):
         """
@@ -384,6 +420,92 @@ class JobState(object):
         )
 
 
+class PackageNameResolver(object):
+    """
+    Resolves package names to :class:`PackageName
+    <distro_tracker.core.models.PackageName>` instances without querying the
+    database for each of them: the names, IDs and types of all the packages
+    are loaded with a single query the first time one is resolved.
+
+    A :class:`Job` shares its resolver between its tasks.
+    """
+    #: The models of the package types, by the name of their type field
+    MODELS = {
+        'source': SourcePackageName,
+        'binary': BinaryPackageName,
+        'pseudo': PseudoPackageName,
+    }
+
+    def __init__(self):
+        self._packages = None
+
+    def _get_packages(self):
+        if self._packages is None:
+            self._packages = {
+                name: (package_id, source, binary, pseudo)
+                for name, package_id, source, binary, pseudo in
+                PackageName.objects.values_list(
+                    'name', 'id', 'source', 'binary', 'pseudo').iterator()
+            }
+        return self._packages
+
+    def invalidate(self):
+        """
+        Forgets the loaded packages, so that they are loaded again the next
+        time a name is resolved. To be used when packages may have been added
+        or removed by other means than :meth:`get_or_create`.
+        """
+        self._packages = None
+
+    def get_id(self, name, package_type=None):
+        """
+        :param package_type: ``'source'``, ``'binary'`` or ``'pseudo'`` to
+            resolve only the names of the packages of this type.
+
+        :returns: The ID of the package with the given name, or ``None`` if
+            there is no such package.
+        """
+        entry = self._get_packages().get(name)
+        if entry is None:
+            return None
+        package_id, source, binary, pseudo = entry
+        types = {'source': source, 'binary': binary, 'pseudo': pseudo}
+        if package_type is not None and not types[package_type]:
+            return None
+        return package_id
+
+    def get(self, name, package_type=None):
+        """
+        :param package_type: ``'source'``, ``'binary'`` or ``'pseudo'`` to
+            resolve only the names of the packages of this type.
+
+        :returns: An instance of the model of the given package type, or of
+            :class:`PackageName <distro_tracker.core.models.PackageName>`,
+            or ``None`` if there is no such package. Only its ID, name and
+            type are set: it can be used to refer to the package, but it
+            must not be saved.
+        """
+        package_id = self.get_id(name, package_type)
+        if package_id is None:
+            return None
+        _, source, binary, pseudo = self._get_packages()[name]
+        model = self.MODELS.get(package_type, PackageName)
+        return model(id=package_id, name=name,
+                     source=source, binary=binary, pseudo=pseudo)
+
+    def get_or_create(self, name):
+        """
+        Resolves the given name, creating a :class:`PackageName
+        <distro_tracker.core.models.PackageName>` if there is no package
+        with this name yet.
+        """
+        package = self.get(name)
+        if package is None:
+            package = PackageName.objects.create(name=name)
+            self._get_packages()[name] = (package.id, False, False, False)
+        return package
+
+
 class Job(object):
     """
     A class used to initialize and run a set of interdependent tasks.
@@ -402,6 +524,8 @@ class Job(object):
         .. note::
            "Task classes" are all subclasses of :class:`BaseTask`
         """
+        #: The :class:`PackageNameResolver` shared by the tasks of the job
+        self.package_names = PackageNameResolver()
         # Build this job's DAG based on the full DAG of all tasks.
         self.job_dag = base_task_class.build_full_task_dag()
         # The full DAG contains dependencies between Task classes, but the job
@@ -470,11 +594,15 @@ class Job(object):
 
         :param processed_task: A finished task
         :type processed_task: :class:`BaseTask` subclass
+
+        :returns: The tasks which have been flagged by this update
+        :rtype: list
         """
         event_names_raised = set(
             event.name
             for event in processed_task.raised_events
         )
+        flagged_tasks = []
         for dependent_task in \
                 self.job_dag.directly_dependent_tasks(processed_task):
             if dependent_task.event_received:
@@ -483,18 +611,32 @@ class Job(object):
             for event_name in event_names_raised:
                 if event_name in dependent_task.DEPENDS_ON_EVENTS:
                     dependent_task.event_received = True
+                    flagged_tasks.append(dependent_task)
                     break
+        return flagged_tasks
 
+    @shared_http_session()
     def run(self, parameters=None):
         """
         Starts the Job processing.
 
-        It runs all tasks which depend on the given initial task.
+        It runs all tasks which depend on the given initial task. The tasks
+        share a single HTTP session so that they reuse the same connections.
+        The HTTP resources of the tasks are fetched concurrently as soon as
+        the tasks are known to run.
 
         :param parameters: Additional parameters which are given to each task
             before it is executed.
         """
         self.job_state.additional_parameters = parameters
+        # Fetch the HTTP resources of the tasks which are known to run. The
+        # resources of the other tasks are fetched once an event they depend
+        # on is raised.
+        prefetch_task_resources([
+            task for task in self.job_dag.all_tasks
+            if task.event_received
+            if task.task_name() not in self.job_state.processed_tasks
+        ], parameters)
         for task in self.job_dag.topsort_nodes():
             # This happens if the job was restarted. Skip such tasks since they
             # considered finish by this job. All its events will be propagated
@@ -523,10 +665,15 @@ class Job(object):
                         task=task.task_name()))
                 except Exception:
                     logger.exception("Problem processing a task.")
+                # The tasks signal their changes with events, which might
+                # include new or removed packages.
+                if task.raised_events:
+                    self.package_names.invalidate()
                 # Update dependent tasks based on events raised.
                 # The update is performed regardless of a possible failure in
                 # order not to miss some events.
-                self._update_task_events(task)
+                prefetch_task_resources(
+                    self._update_task_events(task), parameters)
 
             self.job_state.add_processed_task(task)
             self.job_state.save_state()
@@ -552,6 +699,25 @@ def clear_all_events_on_exception(func):
     return wrapper
 
 
+def prefetch_task_resources(tasks, parameters=None):
+    """
+    Updates concurrently the cached HTTP resources used by the given tasks.
+
+    :param tasks: The tasks (classes or instances) whose
+        :meth:`resources <BaseTask.get_resources>` should be fetched
+    :type tasks: ``iterable`` of :class:`BaseTask` subclasses
+    :param parameters: The additional parameters given to the tasks. Their
+        ``force_update`` parameter forces full downloads of the resources.
+    """
+    urls = []
+    for task in tasks:
+        urls.extend(task.get_resources())
+    if urls:
+        force = bool(parameters and parameters.get('force_update'))
+        cache = HttpCache(settings.DISTRO_TRACKER_CACHE_DIRECTORY)
+        cache.prefetch(urls, force=force)
+
+
 def import_all_tasks():
     """
     Imports tasks found in each installed app's ``tracker_tasks`` module.
@@ -594,21 +760,27 @@ def run_task(initial_task, parameters=None):
     return job.run(parameters)
 
 
+@shared_http_session()
 def run_all_tasks(parameters=None):
     """
     Runs all registered tasks which do not have any dependencies.
 
+    The HTTP resources of all those tasks are fetched concurrently before
+    running the first one.
+
     :param parameters: Additional parameters which are given to each task
     before it is executed.
     """
     import_all_tasks()
 
-    for task in BaseTask.plugins:
-        if task is BaseTask:
-            continue
-        if not task.DEPENDS_ON_EVENTS:
-            logger.info("Starting task %s", task.task_name())
-            run_task(task)
+    tasks = [
+        task for task in BaseTask.plugins
+        if task is not BaseTask and not task.DEPENDS_ON_EVENTS
+    ]
+    prefetch_task_resources(tasks, parameters)
+    for task in tasks:
+        logger.info("Starting task %s", task.task_name())
+        run_task(task)
 
 
 def continue_task_from_state(job_state):
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 The Distro Tracker Developers
+# See the COPYRIGHT file at the top-level directory of this distribution and
+# at https://deb.li/DTAuthors
+#
+# This file is part of Distro Tracker. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this
+# distribution and at https://deb.li/DTLicense. No part of Distro Tracker,
+# including this file, may be copied, modified, propagated, or distributed
+# except according to the terms contained in the LICENSE file.
+
+"""
+Tests for the Distro Tracker core's read replica database routing.
+"""
+from __future__ import unicode_literals
+from django.core.urlresolvers import reverse
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from distro_tracker.test import SimpleTestCase, TestCase
+from distro_tracker.core.db_router import ReadReplicaMiddleware
+from distro_tracker.core.db_router import ReadReplicaRouter
+from distro_tracker.core.db_router import STICKY_COOKIE_NAME
+from distro_tracker.core.db_router import read_replicas
+from distro_tracker.core.models import News
+from distro_tracker.core.models import PackageName
+from django_email_accounts.models import User
+
+import time
+
+
+@override_settings(DISTRO_TRACKER_DATABASE_REPLICAS=['replica'])
+class ReadReplicaRouterTests(SimpleTestCase):
+    """
+    Tests for :class:`distro_tracker.core.db_router.ReadReplicaRouter`.
+    """
+    def setUp(self):
+        self.router = ReadReplicaRouter()
+        self.middleware = ReadReplicaMiddleware()
+        self.factory = RequestFactory()
+        # Start from a clean state for the current thread
+        self.middleware.process_request(self.factory.get('/'))
+
+    def test_read_outside_of_read_only_code(self):
+        self.assertIsNone(self.router.db_for_read(PackageName))
+
+    def test_read_in_read_only_code(self):
+        with read_replicas():
+            self.assertEqual('replica', self.router.db_for_read(PackageName))
+
+    def test_read_in_decorated_function(self):
+        @read_replicas()
+        def read_only():
+            return self.router.db_for_read(PackageName)
+
+        self.assertEqual('replica', read_only())
+
+    @override_settings(DISTRO_TRACKER_DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        with read_replicas():
+            self.assertIsNone(self.router.db_for_read(PackageName))
+
+    def test_read_after_write_uses_primary(self):
+        self.assertEqual('default', self.router.db_for_write(PackageName))
+
+        with read_replicas():
+            self.assertEqual('default', self.router.db_for_read(PackageName))
+
+    def test_no_migrations_on_replicas(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'core'))
+        self.assertIsNone(self.router.allow_migrate('default', 'core'))
+
+    def test_middleware_sets_cookie_after_write(self):
+        request = self.factory.post('/')
+        response = self.middleware.process_response(request, HttpResponse())
+
+        self.assertIn(STICKY_COOKIE_NAME, response.cookies)
+
+    def test_middleware_no_cookie_on_read(self):
+        request = self.factory.get('/')
+        response = self.middleware.process_response(request, HttpResponse())
+
+        self.assertNotIn(STICKY_COOKIE_NAME, response.cookies)
+
+    def test_middleware_sticky_client_uses_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE_NAME] = str(time.time() + 60)
+
+        self.middleware.process_request(request)
+
+        with read_replicas():
+            self.assertEqual('default', self.router.db_for_read(PackageName))
+
+
+@override_settings(DISTRO_TRACKER_DATABASE_REPLICAS=['replica'])
+class ReadReplicaViewTests(TestCase):
+    """
+    Tests the routing of the queries of the views between the primary
+    database and the ``replica`` database of the test settings.
+    """
+    multi_db = True
+
+    def setUp(self):
+        # The replica lags behind the primary database: each database has
+        # a different news for the package
+        for db, title in (('default', 'Primary news'),
+                          ('replica', 'Replica news')):
+            package = PackageName.objects.using(db).create(
+                id=1, name='dummy-package')
+            News.objects.using(db).create(
+                package=package, title=title, created_by='Author')
+        self.news_url = reverse('dtracker-package-news', kwargs={
+            'package_name': 'dummy-package',
+        })
+
+    def test_news_page_read_from_replica(self):
+        """
+        Tests that the news of the news page, which are fetched while its
+        template is rendered, are read from the replica.
+        """
+        response = self.client.get(self.news_url)
+
+        self.assertContains(response, 'Replica news')
+        self.assertNotContains(response, 'Primary news')
+
+    def test_write_goes_to_primary_and_sticks(self):
+        """
+        Tests that a write goes to the primary database and that the client
+        then reads from the primary database thanks to the sticky cookie.
+        """
+        User.objects.db_manager('default').create_user(
+            main_email='user@domain.com', password='password')
+
+        response = self.client.post(reverse('dtracker-accounts-login'), {
+            'username': 'user@domain.com',
+            'password': 'password',
+        })
+
+        self.assertIn(STICKY_COOKIE_NAME, response.cookies)
+        user = User.objects.using('default').get(main_email='user@domain.com')
+        self.assertIsNotNone(user.last_login)
+        self.assertFalse(User.objects.using('replica').exists())
+        response = self.client.get(self.news_url)
+        self.assertContains(response, 'Primary news')
+        self.assertNotContains(response, 'Replica news')
@@ -15,6 +15,7 @@ Tests for the Distro Tracker core management commands.
 """
 from __future__ import unicode_literals
 
+from django.utils import six
 from django.utils.six.moves import mock
 from django.core.management import call_command
 
@@ -23,11 +24,16 @@ from distro_tracker.accounts.models import UserEmail
 from distro_tracker.core.models import EmailNews
 from distro_tracker.core.models import EmailSettings
 from distro_tracker.core.models import News
+from distro_tracker.core.models import Repository
+from distro_tracker.core.models import SourcePackage
 from distro_tracker.core.models import SourcePackageName
 from distro_tracker.core.models import Subscription
 from distro_tracker.core.utils import message_from_bytes
+from distro_tracker.core.utils.http import HttpCache
 from distro_tracker.test import SimpleTestCase
 from distro_tracker.test import TestCase
+from distro_tracker.test.utils import make_temp_directory
+from distro_tracker.test.utils import set_mock_response
 
 
 class RunTaskManagementCommandTest(SimpleTestCase):
@@ -252,3 +258,46 @@ class FixDatabaseCommandTests(TestCase):
         self.user_email.emailsettings.delete()
         self.alt_user_email.emailsettings.delete()
         call_command('tracker_fix_database')
+
+
+class UpdateMainVersionsCommandTest(TestCase):
+    """
+    Tests for the :mod:`tracker_update_main_versions
+    <distro_tracker.core.management.commands.tracker_update_main_versions>`
+    management command.
+    """
+    def test_main_versions_updated(self):
+        repository = Repository.objects.create(name='repo', default=True)
+        name = SourcePackageName.objects.create(name='dummy-package')
+        source_package = SourcePackage.objects.create(
+            source_package_name=name, version='1.0.0')
+        repository.add_source_package(source_package)
+
+        call_command('tracker_update_main_versions')
+
+        name.refresh_from_db()
+        self.assertEqual(source_package, name.main_source_version)
+        self.assertEqual(repository, name.main_source_entry.repository)
+
+
+class HttpCacheCommandTest(SimpleTestCase):
+    """
+    Tests for the :mod:`tracker_http_cache
+    <distro_tracker.core.management.commands.tracker_http_cache>`
+    management command.
+    """
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_prune(self, mock_requests):
+        with make_temp_directory('-dtracker-cache') as cache_directory:
+            set_mock_response(mock_requests, text='content')
+            cache = HttpCache(cache_directory)
+            cache.update('http://example.com/')
+            stdout = six.StringIO()
+
+            with self.settings(DISTRO_TRACKER_CACHE_DIRECTORY=cache_directory):
+                call_command('tracker_http_cache', '--list', '--prune',
+                             '--max-size', '0', stdout=stdout)
+
+            self.assertNotIn('http://example.com/', cache)
+            self.assertIn('Removed 1 resource(s).', stdout.getvalue())
+            self.assertIn('0 resource(s), 0 bytes', stdout.getvalue())
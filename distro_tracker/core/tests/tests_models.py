@@ -39,11 +39,15 @@ from distro_tracker.core.models import EmailNewsRenderer
 from distro_tracker.core.models import SourcePackage
 from distro_tracker.core.models import ExtractedSourceFile
 from distro_tracker.core.models import MailingList
+from distro_tracker.core.models import PackageExtractedInfo
+from distro_tracker.core.models import PackageBugStats
+from distro_tracker.core.models import PackageCounters
 from distro_tracker.core.models import Team
 from distro_tracker.core.models import TeamMembership
 from distro_tracker.core.models import MembershipPackageSpecifics
 from distro_tracker.core.utils import message_from_bytes
 from distro_tracker.core.utils.email_messages import get_decoded_message_payload
+from distro_tracker.core.utils.packages import version_sort_key
 from distro_tracker.accounts.models import User, UserEmail
 from distro_tracker.test.utils import create_source_package
 
@@ -1000,6 +1004,66 @@ class SourcePackageTests(TestCase):
             source_package=self.source_package, repository=self.repository)
         self.assertEqual(expected, self.src_pkg_name.main_entry)
 
+    def test_update_main_versions(self):
+        """
+        Tests that the denormalized main version and main entry are stored
+        on the package name by
+        :meth:`update_main_versions
+        <distro_tracker.core.models.PackageManager.update_main_versions>`.
+        """
+        self.repository.add_source_package(self.source_package)
+        higher_version_pkg = SourcePackage.objects.create(
+            source_package_name=self.src_pkg_name, version='10.0.0')
+        non_default_repository = Repository.objects.create(name='repo')
+        non_default_repository.add_source_package(higher_version_pkg)
+
+        SourcePackageName.objects.update_main_versions()
+
+        package = SourcePackageName.objects.get(pk=self.src_pkg_name.pk)
+        expected = SourcePackageRepositoryEntry.objects.get(
+            source_package=self.source_package, repository=self.repository)
+        self.assertEqual(self.source_package, package.main_source_version)
+        self.assertEqual(expected, package.main_source_entry)
+        with self.assertNumQueries(0):
+            self.assertEqual(expected, package.main_entry)
+            self.assertEqual(self.source_package, package.main_version)
+
+    def test_version_key(self):
+        """
+        Tests that the version sort key is stored when the package is saved.
+        """
+        self.assertEqual(version_sort_key('1.0.0'),
+                         self.source_package.version_key)
+
+        # The highest version is found by ordering on the key
+        SourcePackage.objects.create(
+            source_package_name=self.src_pkg_name, version='1.0.0~rc1')
+        higher_version_pkg = SourcePackage.objects.create(
+            source_package_name=self.src_pkg_name, version='1.0.0+b1')
+        self.assertEqual(
+            higher_version_pkg,
+            SourcePackage.objects.order_by('-version_key').first())
+
+    def test_main_versions_invalidated_by_new_entry(self):
+        """
+        Tests that adding a new version to a repository clears the
+        denormalized main version so that it gets recomputed.
+        """
+        self.repository.add_source_package(self.source_package)
+        SourcePackageName.objects.update_main_versions()
+        higher_version_pkg = SourcePackage.objects.create(
+            source_package_name=self.src_pkg_name, version='10.0.0')
+        self.repository.add_source_package(higher_version_pkg)
+
+        package = SourcePackageName.objects.get(pk=self.src_pkg_name.pk)
+        self.assertIsNone(package.main_source_version)
+        self.assertEqual(higher_version_pkg, package.main_version)
+
+        SourcePackageName.objects.update_main_versions(only_outdated=True)
+
+        package = SourcePackageName.objects.get(pk=self.src_pkg_name.pk)
+        self.assertEqual(higher_version_pkg, package.main_source_version)
+
     def test_get_directory_url(self):
         """
         Tests retrieving the URL of the package's directory from the entry.
@@ -1293,6 +1357,105 @@ class BinaryPackageTests(TestCase):
         )
 
 
+class PackageExtractedInfoTests(TestCase):
+    """
+    Tests for the :class:`PackageExtractedInfoManager
+    <distro_tracker.core.models.PackageExtractedInfoManager>`.
+    """
+    def setUp(self):
+        self.package = PackageName.objects.create(name='dummy-package')
+        self.other_package = PackageName.objects.create(name='other-package')
+
+    def test_bulk_upsert_creates_rows(self):
+        PackageExtractedInfo.objects.bulk_upsert('key', {
+            self.package.id: {'value': 1},
+            self.other_package.id: {'value': 2},
+        })
+
+        info = PackageExtractedInfo.objects.get(key='key', package=self.package)
+        self.assertEqual({'value': 1}, info.value)
+        self.assertEqual(2, PackageExtractedInfo.objects.count())
+
+    def test_bulk_upsert_updates_changed_rows(self):
+        PackageExtractedInfo.objects.create(
+            key='key', package=self.package, value={'value': 1})
+        PackageExtractedInfo.objects.create(
+            key='other-key', package=self.package, value={'value': 1})
+
+        PackageExtractedInfo.objects.bulk_upsert('key', {
+            self.package.id: {'value': 2},
+        })
+
+        info = PackageExtractedInfo.objects.get(key='key', package=self.package)
+        self.assertEqual({'value': 2}, info.value)
+        # Other keys are left alone
+        info = PackageExtractedInfo.objects.get(key='other-key',
+                                                package=self.package)
+        self.assertEqual({'value': 1}, info.value)
+
+    def test_bulk_upsert_delete_missing(self):
+        PackageExtractedInfo.objects.create(
+            key='key', package=self.package, value={'value': 1})
+        PackageExtractedInfo.objects.create(
+            key='key', package=self.other_package, value={'value': 1})
+
+        PackageExtractedInfo.objects.bulk_upsert('key', {
+            self.package.id: {'value': 1},
+        }, delete_missing=True)
+
+        self.assertEqual(
+            [self.package.id],
+            list(PackageExtractedInfo.objects.values_list(
+                'package_id', flat=True)))
+
+    def test_bulk_upsert_keeps_missing_by_default(self):
+        PackageExtractedInfo.objects.create(
+            key='key', package=self.other_package, value={'value': 1})
+
+        PackageExtractedInfo.objects.bulk_upsert('key', {
+            self.package.id: {'value': 1},
+        })
+
+        self.assertEqual(2, PackageExtractedInfo.objects.count())
+
+
+class PackageDataManagerTests(TestCase):
+    """
+    Tests for the :class:`PackageDataManager
+    <distro_tracker.core.models.PackageDataManager>`.
+    """
+    def test_sync(self):
+        """
+        Tests that only the new, changed and removed rows are written.
+        """
+        unchanged = PackageName.objects.create(name='unchanged-package')
+        changed = PackageName.objects.create(name='changed-package')
+        removed = PackageName.objects.create(name='removed-package')
+        new = PackageName.objects.create(name='new-package')
+        for package in (unchanged, changed, removed):
+            PackageBugStats.objects.create(package=package, stats={'rc': 1})
+        unchanged_id = PackageBugStats.objects.get(package=unchanged).id
+        changed_id = PackageBugStats.objects.get(package=changed).id
+
+        result = PackageBugStats.objects.sync({
+            unchanged.id: {'rc': 1},
+            changed.id: {'rc': 2},
+            new.id: {'rc': 3},
+        })
+
+        self.assertEqual((1, 1, 1), result)
+        self.assertEqual(3, PackageBugStats.objects.count())
+        self.assertEqual(
+            unchanged_id, PackageBugStats.objects.get(package=unchanged).id)
+        stats = PackageBugStats.objects.get(package=changed)
+        self.assertEqual(changed_id, stats.id)
+        self.assertEqual({'rc': 2}, stats.stats)
+        self.assertEqual(
+            {'rc': 3}, PackageBugStats.objects.get(package=new).stats)
+        self.assertFalse(
+            PackageBugStats.objects.filter(package=removed).exists())
+
+
 class MailingListTest(TestCase):
     def test_validate_url_template(self):
         """
@@ -1706,6 +1869,135 @@ class ActionItemTests(TestCase):
 
         self.assertIn("data1, data2", action_item.full_description)
 
+    def test_reconcile(self):
+        """
+        Tests that
+        :meth:`distro_tracker.core.models.ActionItemManager.reconcile`
+        creates, updates and deletes the items to match the given data.
+        """
+        unchanged = PackageName.objects.create(name='unchanged-package')
+        obsolete = PackageName.objects.create(name='obsolete-package')
+        for package in (self.package, unchanged, obsolete):
+            ActionItem.objects.create(
+                package=package,
+                item_type=self.action_type,
+                short_description='Old description',
+                extra_data={'count': 1})
+        new = PackageName.objects.create(name='new-package')
+        unchanged_item = ActionItem.objects.get(package=unchanged)
+
+        result = ActionItem.objects.reconcile(self.action_type, {
+            self.package.name: (
+                ActionItem.SEVERITY_HIGH, 'New description', {'count': 2}),
+            unchanged.name: (
+                ActionItem.SEVERITY_NORMAL, 'Old description', {'count': 1}),
+            new.name: (
+                ActionItem.SEVERITY_LOW, 'Description', None),
+            'unknown-package': (
+                ActionItem.SEVERITY_LOW, 'Description', None),
+        })
+
+        self.assertEqual((1, 1, 1), result)
+        self.assertEqual(3, ActionItem.objects.count())
+        item = ActionItem.objects.get(package=self.package)
+        self.assertEqual(ActionItem.SEVERITY_HIGH, item.severity)
+        self.assertEqual('New description', item.short_description)
+        self.assertEqual({'count': 2}, item.extra_data)
+        self.assertEqual(
+            unchanged_item.last_updated_timestamp,
+            ActionItem.objects.get(package=unchanged).last_updated_timestamp)
+        item = ActionItem.objects.get(package=new)
+        self.assertEqual('Description', item.short_description)
+        self.assertFalse(ActionItem.objects.filter(package=obsolete).exists())
+
+    def test_reconcile_with_key(self):
+        """
+        Tests that
+        :meth:`distro_tracker.core.models.ActionItemManager.reconcile` only
+        updates the items whose key has changed when one is given.
+        """
+        ActionItem.objects.create(
+            package=self.package,
+            item_type=self.action_type,
+            short_description='Old description',
+            extra_data={'count': 1, 'url': 'old'})
+
+        result = ActionItem.objects.reconcile(self.action_type, {
+            self.package.name: (
+                ActionItem.SEVERITY_NORMAL, 'New description',
+                {'count': 1, 'url': 'new'}),
+        }, key=lambda data: data.get('count'))
+
+        self.assertEqual((0, 0, 0), result)
+        item = ActionItem.objects.get(package=self.package)
+        self.assertEqual('Old description', item.short_description)
+
+
+class PackageCountersTests(TestCase):
+    """
+    Tests for the :class:`distro_tracker.core.models.PackageCounters` model.
+    """
+    def setUp(self):
+        self.package = PackageName.objects.create(name='dummy-package')
+        self.other_package = PackageName.objects.create(name='other-package')
+        self.action_type = ActionItemType.objects.create(type_name='type-1')
+        self.other_action_type = ActionItemType.objects.create(
+            type_name='type-2')
+
+    def add_action_item(self, item_type, severity):
+        return ActionItem.objects.create(
+            package=self.package, item_type=item_type, severity=severity,
+            short_description='Short description')
+
+    def test_refresh(self):
+        """
+        Tests that the counters are computed from the related objects.
+        """
+        Subscription.objects.create_for(
+            package_name=self.package.name, email='user@domain.com')
+        self.add_action_item(self.action_type, ActionItem.SEVERITY_HIGH)
+        self.add_action_item(self.other_action_type, ActionItem.SEVERITY_LOW)
+        news = News.objects.create(package=self.package, title='News')
+
+        PackageCounters.objects.refresh()
+
+        counters = PackageCounters.objects.get(package=self.package)
+        self.assertEqual(1, counters.subscriber_count)
+        self.assertEqual(1, counters.high_action_items)
+        self.assertEqual(1, counters.low_action_items)
+        self.assertEqual(0, counters.critical_action_items)
+        self.assertEqual(2, counters.action_item_count)
+        self.assertEqual(ActionItem.SEVERITY_HIGH, counters.highest_severity)
+        self.assertEqual(news.datetime_created,
+                         counters.latest_news_timestamp)
+        # Packages without related objects do not have counters
+        self.assertFalse(
+            PackageCounters.objects.filter(
+                package=self.other_package).exists())
+
+    def test_refresh_updates_and_drops_counters(self):
+        """
+        Tests that outdated counters are updated and counters of packages
+        which no longer have related objects are dropped.
+        """
+        item = self.add_action_item(self.action_type,
+                                    ActionItem.SEVERITY_CRITICAL)
+        PackageCounters.objects.refresh()
+        item.severity = ActionItem.SEVERITY_NORMAL
+        item.save()
+
+        PackageCounters.objects.refresh()
+
+        counters = PackageCounters.objects.get(package=self.package)
+        self.assertEqual(0, counters.critical_action_items)
+        self.assertEqual(1, counters.normal_action_items)
+        self.assertEqual(ActionItem.SEVERITY_NORMAL, counters.highest_severity)
+
+        item.delete()
+        PackageCounters.objects.refresh()
+
+        self.assertEqual(0, PackageCounters.objects.count())
+
 
 class TeamTests(TestCase):
     """
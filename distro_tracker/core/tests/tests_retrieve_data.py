@@ -1229,6 +1229,45 @@ class UpdateTeamPackagesTaskTests(TestCase):
         for source_package in team_maintainer_packages:
             self.assertIn(source_package.source_package_name.name, all_packages)
 
+    def test_number_of_queries_does_not_depend_on_packages(self):
+        """
+        Tests that the team packages are computed and stored with a constant
+        number of queries, regardless of the number of new packages.
+        """
+        uploader_team = Team.objects.create_with_slug(
+            owner=self.user,
+            name='uploader-team',
+            maintainer_email=self.uploaders[0])
+        package_names = []
+        for i in range(5):
+            source_package = create_source_package({
+                'name': 'package-{}'.format(i),
+                'version': '1.0.0',
+                'maintainer': {
+                    'name': 'Maintainer',
+                    'email': self.maintainer_email,
+                },
+                'uploaders': self.uploaders,
+            })
+            package_names.append(source_package.name)
+            self.repository.add_source_package(source_package)
+            self.add_mock_events('new-source-package-version-in-repository', {
+                'name': source_package.name,
+                'version': source_package.version,
+                'repository': self.repository.name,
+            })
+
+        with self.assertNumQueries(6):
+            self.run_task()
+
+        # Both the maintainer's and the uploader's teams got all the packages
+        for team in (self.team, uploader_team):
+            self.assertEqual(
+                sorted(package_names),
+                sorted(team.packages.values_list('name', flat=True)))
+
+        self.assertEqual(5, self.team.packages.count())
+
 
 class UpdatePackageGeneralInformationTest(TestCase):
     """
@@ -17,9 +17,14 @@ from __future__ import unicode_literals
 from distro_tracker.test import TestCase
 from django.utils.six.moves import mock
 from distro_tracker.core.models import RunningJob
+from distro_tracker.core.models import PackageName
+from distro_tracker.core.models import SourcePackageName
+from distro_tracker.core.models import BinaryPackageName
 from distro_tracker.core.tasks import BaseTask
 from distro_tracker.core.tasks import Event
+from distro_tracker.core.tasks import Job
 from distro_tracker.core.tasks import JobState
+from distro_tracker.core.tasks import PackageNameResolver
 from distro_tracker.core.tasks import run_task, continue_task_from_state
 from distro_tracker.core.tasks import run_all_tasks
 import logging
@@ -337,6 +342,47 @@ class JobTests(TestCase):
             independent_tasks[0],
             [dependent_tasks[0]])
 
+    @mock.patch('distro_tracker.core.tasks.HttpCache')
+    def test_run_job_prefetches_resources(self, mock_cache, *args, **kwargs):
+        """
+        Tests that the resources of the initial task are fetched before
+        running the job and those of a dependent task once an event it
+        depends on is raised.
+        """
+        T0 = self.create_task_class(('A',), (), ('A',))
+        T0.RESOURCES = ('http://example.com/a',)
+        T1 = self.create_task_class((), ('A',), ())
+        T1.RESOURCES = ('http://example.com/b',)
+
+        run_task(T0)
+
+        mock_prefetch = mock_cache.return_value.prefetch
+        self.assertEqual(
+            [
+                mock.call(['http://example.com/a'], force=False),
+                mock.call(['http://example.com/b'], force=False),
+            ],
+            mock_prefetch.call_args_list)
+        self.assert_executed_tasks_equal([T0, T1])
+
+    @mock.patch('distro_tracker.core.tasks.HttpCache')
+    def test_run_job_skips_resources_of_tasks_not_run(
+            self, mock_cache, *args, **kwargs):
+        """
+        Tests that the resources of a task are not fetched when no event it
+        depends on is raised.
+        """
+        T0 = self.create_task_class(('A',), (), ())
+        T0.RESOURCES = ('http://example.com/a',)
+        T1 = self.create_task_class((), ('A',), ())
+        T1.RESOURCES = ('http://example.com/b',)
+
+        run_task(T0)
+
+        mock_cache.return_value.prefetch.assert_called_once_with(
+            ['http://example.com/a'], force=False)
+        self.assert_executed_tasks_equal([T0])
+
     def test_run_job_with_fail_task(self, *args, **kwargs):
         """
         Tests that running a job where one task fails works as expected.
@@ -364,6 +410,94 @@ class JobTests(TestCase):
             [root_task, fail_task, depends_on_fail, do_run]
         )
 
+    def test_package_names_shared_by_tasks(self, *args, **kwargs):
+        """
+        Tests that the tasks of a job share its package name resolver, which
+        is invalidated after each task which raised events.
+        """
+        A = self.create_task_class(('a',), (), ('a',))
+        B = self.create_task_class((), ('a',), ())
+        job = Job(A)
+
+        self.assertEqual(
+            {A, B}, set(type(task) for task in job.job_dag.all_tasks))
+        for task in job.job_dag.all_tasks:
+            self.assertIs(job.package_names, task.package_names)
+        with mock.patch.object(job.package_names, 'invalidate') as invalidate:
+            job.run()
+        # Only A raised events
+        self.assert_executed_tasks_equal([A, B])
+        invalidate.assert_called_once_with()
+
+
+class PackageNameResolverTests(TestCase):
+    """
+    Tests for the :class:`distro_tracker.core.tasks.PackageNameResolver`
+    class.
+    """
+    def setUp(self):
+        self.source = SourcePackageName.objects.create(name='src')
+        self.binary = BinaryPackageName.objects.create(name='bin')
+        self.resolver = PackageNameResolver()
+
+    def test_resolve_with_one_query(self):
+        """
+        Tests that all the names are resolved with a single query.
+        """
+        with self.assertNumQueries(1):
+            self.assertEqual(self.source.id, self.resolver.get_id('src'))
+            self.assertEqual(
+                self.binary.id, self.resolver.get_id('bin', 'binary'))
+            self.assertIsNone(self.resolver.get_id('bin', 'source'))
+            self.assertIsNone(self.resolver.get_id('unknown'))
+
+    def test_get(self):
+        """
+        Tests that the resolved packages are instances of the model of the
+        requested type.
+        """
+        package = self.resolver.get('src', 'source')
+
+        self.assertIsInstance(package, SourcePackageName)
+        self.assertEqual(self.source.pk, package.pk)
+        self.assertEqual('src', package.name)
+        self.assertIsNone(self.resolver.get('src', 'pseudo'))
+
+    def test_get_or_create(self):
+        """
+        Tests that a missing package is created and resolved afterwards.
+        """
+        self.resolver.get_id('src')
+
+        package = self.resolver.get_or_create('new')
+
+        self.assertTrue(PackageName.objects.filter(name='new').exists())
+        with self.assertNumQueries(0):
+            self.assertEqual(package.id, self.resolver.get_id('new'))
+            self.assertEqual(
+                self.source.id, self.resolver.get_or_create('src').id)
+
+    def test_invalidate(self):
+        """
+        Tests that the packages are loaded again after an invalidation.
+        """
+        self.resolver.get_id('src')
+        SourcePackageName.objects.create(name='other')
+        self.assertIsNone(self.resolver.get_id('other'))
+
+        self.resolver.invalidate()
+
+        self.assertIsNotNone(self.resolver.get_id('other'))
+
+    def test_task_without_job(self):
+        """
+        Tests that a task which does not belong to a job has its own resolver.
+        """
+        task = BaseTask()
+
+        self.assertIsInstance(task.package_names, PackageNameResolver)
+        self.assertIs(task.package_names, task.package_names)
+
 
 class JobPersistenceTests(TestCase):
     def create_mock_event(self, event_name, event_arguments=None):
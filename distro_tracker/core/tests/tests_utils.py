@@ -19,12 +19,20 @@ from email import encoders
 from email.header import Header
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
+import io
+import json
 import os
+import re
+import requests
 import time
 import tempfile
+import threading
+import unittest
 
 from debian import deb822
+import yaml
 from django.core import mail
+from django.db.utils import NotSupportedError
 from django.test.utils import override_settings
 from django.utils import six
 from django.utils.http import http_date
@@ -37,11 +45,17 @@ from distro_tracker.core.utils import message_from_bytes
 from distro_tracker.core.utils import now
 from distro_tracker.core.utils import SpaceDelimitedTextField
 from distro_tracker.core.utils import PrettyPrintList
+from distro_tracker.core.utils import iter_json_items
+from distro_tracker.core.utils import iter_yaml_items
+from distro_tracker.core.utils import LineRecordParser
 from distro_tracker.core.utils import verify_signature
+from distro_tracker.core.utils.jsonb import JSONField
+from distro_tracker.core.utils.jsonb import KeyTransformFactory
 from distro_tracker.core.utils.packages import AptCache
 from distro_tracker.core.utils.packages import extract_vcs_information
 from distro_tracker.core.utils.packages import extract_dsc_file_name
 from distro_tracker.core.utils.packages import package_hashdir
+from distro_tracker.core.utils.packages import version_sort_key
 from distro_tracker.core.utils.datastructures import DAG, InvalidDAGException
 from distro_tracker.core.utils.email_messages import CustomEmailMessage
 from distro_tracker.core.utils.email_messages import decode_header
@@ -54,8 +68,13 @@ from distro_tracker.core.utils.linkify import LinkifyDebianBugLinks
 from distro_tracker.core.utils.linkify import LinkifyUbuntuBugLinks
 from distro_tracker.core.utils.linkify import LinkifyHttpLinks
 from distro_tracker.core.utils.linkify import LinkifyCVELinks
+from distro_tracker.core.utils import http as http_utils
 from distro_tracker.core.utils.http import HttpCache
+from distro_tracker.core.utils.http import HttpFixturesAdapter
 from distro_tracker.core.utils.http import get_resource_content
+from distro_tracker.core.utils.http import get_resource_lines
+from distro_tracker.core.utils.http import run_concurrently
+from distro_tracker.core.utils.http import shared_http_session
 from distro_tracker.test import TestCase, SimpleTestCase
 from distro_tracker.test.utils import set_mock_response
 from distro_tracker.test.utils import make_temp_directory
@@ -563,6 +582,157 @@ class DAGTests(SimpleTestCase):
         self.assertIn(3, g.nodes_reachable_from(1))
 
 
+class IterJsonItemsTest(SimpleTestCase):
+    """
+    Tests for the :func:`distro_tracker.core.utils.iter_json_items` function.
+    """
+    def setUp(self):
+        self.data = {
+            'format': 1,
+            'packages': [
+                {'name': 'pkg{}'.format(i), 'size': 1234567890 + i,
+                 'description': 'quote " and brace } \u00e9'}
+                for i in range(20)
+            ],
+        }
+        self.content = json.dumps(self.data, indent=2, ensure_ascii=False)
+
+    def test_object_members(self):
+        """
+        Tests iterating over the members of an object, reading the file in
+        chunks smaller than the values.
+        """
+        for chunk_size in (1, 7, 4096):
+            self.assertEqual(
+                sorted(self.data.items()),
+                sorted(iter_json_items(io.StringIO(self.content),
+                                       chunk_size=chunk_size)))
+
+    def test_nested_array_elements(self):
+        """
+        Tests iterating over the elements of an array found at a given path,
+        from a binary file.
+        """
+        stream = io.BytesIO(self.content.encode('utf-8'))
+
+        self.assertEqual(
+            self.data['packages'],
+            list(iter_json_items(stream, path=('packages',), chunk_size=5)))
+
+    def test_missing_path(self):
+        """
+        Tests that nothing is yielded when the path does not exist.
+        """
+        self.assertEqual(
+            [], list(iter_json_items(io.StringIO(self.content), ('missing',))))
+
+    def test_empty_containers(self):
+        self.assertEqual([], list(iter_json_items(io.StringIO(' [ ] '))))
+        self.assertEqual([], list(iter_json_items(io.StringIO('{}'))))
+
+    def test_invalid_content(self):
+        """
+        Tests that a ValueError is raised for invalid or truncated content.
+        """
+        for content in ('', '1', '[1, 2', '{"a" 1}', '[1 2]'):
+            with self.assertRaises(ValueError):
+                list(iter_json_items(io.StringIO(content), chunk_size=2))
+
+
+class IterYamlItemsTest(SimpleTestCase):
+    """
+    Tests for the :func:`distro_tracker.core.utils.iter_yaml_items` function.
+    """
+    content = (
+        'generated-date: 2016-01-01 00:00:00\n'
+        'other: {a: [1, 2], b: {c: d}}\n'
+        'sources:\n'
+        '- item-name: pkg1\n'
+        '  excuses: [\'Maintainer: Jane\', 10 days old (needed 5 days)]\n'
+        '- item-name: pkg2\n'
+        '  excuses: []\n'
+    )
+
+    def test_mapping_entries(self):
+        """
+        Tests iterating over the entries of the top-level mapping.
+        """
+        items = dict(iter_yaml_items(io.StringIO(self.content)))
+
+        self.assertEqual(['generated-date', 'other', 'sources'],
+                         sorted(items.keys()))
+        self.assertEqual({'a': [1, 2], 'b': {'c': 'd'}}, items['other'])
+
+    def test_nested_sequence_elements(self):
+        """
+        Tests iterating over the elements of a sequence found at a given path.
+        """
+        self.assertEqual([
+            {'item-name': 'pkg1',
+             'excuses': ['Maintainer: Jane', '10 days old (needed 5 days)']},
+            {'item-name': 'pkg2', 'excuses': []},
+        ], list(iter_yaml_items(self.content, path=('sources',))))
+
+    def test_missing_path(self):
+        """
+        Tests that nothing is yielded when the path does not exist.
+        """
+        self.assertEqual(
+            [], list(iter_yaml_items(self.content, path=('missing',))))
+        self.assertEqual([], list(iter_yaml_items('')))
+
+    def test_invalid_content(self):
+        with self.assertRaises(yaml.YAMLError):
+            list(iter_yaml_items('sources: [1, 2'))
+
+
+class LineRecordParserTest(SimpleTestCase):
+    """
+    Tests for the :class:`distro_tracker.core.utils.LineRecordParser` class.
+    """
+    def test_parse_records(self):
+        """
+        Tests that the values of the declared fields are converted and the
+        values found after them are ignored.
+        """
+        parser = LineRecordParser(
+            ('package', ('errors', int), ('warnings', int)), separator='|')
+
+        records = list(parser.parse(['pkg1|1|2|0|0\n', 'pkg2 | 3 | 4']))
+
+        self.assertEqual([
+            {'package': 'pkg1', 'errors': 1, 'warnings': 2},
+            {'package': 'pkg2', 'errors': 3, 'warnings': 4},
+        ], records)
+        self.assertEqual(2, parser.records)
+        self.assertEqual(0, parser.errors)
+
+    def test_invalid_lines_counted(self):
+        """
+        Tests that the lines with too few or invalid values are skipped and
+        counted, while blank lines are ignored.
+        """
+        parser = LineRecordParser(('package', ('errors', int)))
+
+        records = list(parser.parse(['pkg1 1', 'pkg2', '', 'pkg3 many']))
+
+        self.assertEqual([{'package': 'pkg1', 'errors': 1}], records)
+        self.assertEqual(1, parser.records)
+        self.assertEqual(2, parser.errors)
+
+    def test_regex_separator(self):
+        """
+        Tests splitting the lines on a regular expression, leaving out the
+        fields named ``None``.
+        """
+        parser = LineRecordParser(
+            ('package', None, ('bug', int)), separator=re.compile(r'[\s|]+'))
+
+        self.assertEqual(
+            [{'package': 'pkg:', 'bug': 12345}],
+            list(parser.parse(['pkg: O 12345|RM 67890'])))
+
+
 class PrettyPrintListTest(SimpleTestCase):
     """
     Tests for the PrettyPrintList class.
@@ -647,6 +817,61 @@ class SpaceDelimitedTextFieldTest(SimpleTestCase):
         )
 
 
+class JSONFieldTest(SimpleTestCase):
+    """
+    Tests for the :class:`distro_tracker.core.utils.jsonb.JSONField`.
+    """
+    def setUp(self):
+        self.field = JSONField()
+
+    def test_db_type_postgresql(self):
+        """
+        Tests that :mod:`jsonfield` uses a jsonb column on PostgreSQL, as
+        expected by the migrations and the key lookups.
+        """
+        connection = mock.MagicMock(vendor='postgresql', pg_version=90500)
+        self.assertEqual('jsonb', self.field.db_type(connection))
+
+    @unittest.skipIf(KeyTransformFactory is None,
+                     'django.contrib.postgres is not available')
+    def test_key_transform_postgresql(self):
+        transform = self.field.get_transform('errors')(mock.MagicMock())
+        compiler = mock.MagicMock()
+        compiler.compile.return_value = ('"value"', [])
+        connection = mock.MagicMock(vendor='postgresql')
+
+        sql, params = transform.as_postgresql(compiler, connection)
+
+        self.assertIn('"value" -> ', sql)
+
+    @unittest.skipIf(KeyTransformFactory is None,
+                     'django.contrib.postgres is not available')
+    def test_key_transform_other_databases(self):
+        """
+        Tests that the key lookups are refused on the databases which store
+        JSON as text, even when :mod:`django.contrib.postgres` is available.
+        """
+        transform = self.field.get_transform('errors')(mock.MagicMock())
+        connection = mock.MagicMock(vendor='sqlite')
+
+        with self.assertRaises(NotSupportedError):
+            transform.as_sql(mock.MagicMock(), connection)
+
+    def test_from_db_value_decoded(self):
+        """
+        Tests that values already decoded by the database driver are
+        returned as is.
+        """
+        value = {'key': ['value']}
+        self.assertEqual(
+            value, self.field.from_db_value(value, None, None, None))
+
+    def test_from_db_value_text(self):
+        self.assertEqual(
+            {'key': 'value'},
+            self.field.from_db_value('{"key": "value"}', None, None, None))
+
+
 class PackageUtilsTests(SimpleTestCase):
     """
     Tests the distro_tracker.core.utils.packages utlity functions.
@@ -709,6 +934,41 @@ class PackageUtilsTests(SimpleTestCase):
         self.assertEqual(package_hashdir(""), "")
         self.assertEqual(package_hashdir(None), None)
 
+    def test_version_sort_key(self):
+        """
+        Tests that the keys returned by
+        :func:`distro_tracker.core.utils.packages.version_sort_key` sort in
+        the same order as Debian versions.
+        """
+        ordered_versions = [
+            '~~',
+            '~~a',
+            '~',
+            '0',
+            '1.0~rc1',
+            '1.0',
+            '1.0-1',
+            '1.0-1+b1',
+            '1.0-2',
+            '1.0a',
+            '1.0+dfsg',
+            '1.0.1',
+            '1.2',
+            '1.10',
+            '1:0.1',
+        ]
+        keys = [version_sort_key(version) for version in ordered_versions]
+        self.assertEqual(sorted(keys), keys)
+        self.assertEqual(len(set(keys)), len(keys))
+
+    def test_version_sort_key_equal_versions(self):
+        """
+        Tests that versions considered equal by dpkg have the same key.
+        """
+        self.assertEqual(version_sort_key('1.0'), version_sort_key('1.00'))
+        self.assertEqual(version_sort_key('1.0'), version_sort_key('0:1.0'))
+        self.assertEqual(version_sort_key('1.0'), version_sort_key('1.0-0'))
+
     def test_extract_dsc_file_name(self):
 
         stanza = deb822.Sources(
@@ -884,8 +1144,9 @@ class HttpCacheTest(SimpleTestCase):
         response, updated = cache.update(url)
 
         self.assertFalse(updated)
-        mock_requests.get.assert_called_with(
-            url, verify=False, allow_redirects=True,
+        mock_requests.Session.return_value.get.assert_called_with(
+            url, verify=False, allow_redirects=True, timeout=mock.ANY,
+            stream=True,
             headers={'If-Modified-Since': last_modified})
         # The actual server's response is returned
         self.assertEqual(response.status_code, 304)
@@ -993,8 +1254,9 @@ class HttpCacheTest(SimpleTestCase):
         response, updated = cache.update(url)
 
         self.assertFalse(updated)
-        mock_requests.get.assert_called_with(
-            url, verify=False, allow_redirects=True,
+        mock_requests.Session.return_value.get.assert_called_with(
+            url, verify=False, allow_redirects=True, timeout=mock.ANY,
+            stream=True,
             headers={'If-None-Match': etag, })
         # The actual server's response is returned
         self.assertEqual(response.status_code, 304)
@@ -1051,11 +1313,345 @@ class HttpCacheTest(SimpleTestCase):
         response, updated = cache.update(url, force=True)
 
         # Make sure that we ask for a non-cached version
-        mock_requests.get.assert_called_with(
-            url, verify=False, allow_redirects=True,
+        mock_requests.Session.return_value.get.assert_called_with(
+            url, verify=False, allow_redirects=True, timeout=mock.ANY,
+            stream=True,
             headers={'Cache-Control': 'no-cache'})
         self.assertTrue(updated)
 
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_update_streams_content(self, mock_requests):
+        """
+        Tests that the cache writes the content of the response chunk by
+        chunk, without leaving any temporary file behind.
+        """
+        self.set_mock_response(mock_requests)
+        response = mock_requests.Session.return_value.get.return_value
+        response.iter_content.return_value = [b'Simple ', b'response']
+        cache = HttpCache(self.cache_directory)
+        url = 'http://example.com'
+
+        cache.update(url)
+
+        self.assertTrue(
+            mock_requests.Session.return_value.get.call_args[1]['stream'])
+        self.assertEqual(cache.get_content(url), b'Simple response')
+        self.assertFalse([
+            file_name for file_name in os.listdir(self.cache_directory)
+            if file_name.startswith('.tmp-')
+        ])
+
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_open_content(self, mock_requests):
+        """
+        Tests reading the cached content through a file object and line by
+        line.
+        """
+        self.response_content = 'line 1\nligne 2 é\r\n'.encode('utf-8')
+        self.set_mock_response(mock_requests)
+        cache = HttpCache(self.cache_directory)
+        url = 'http://example.com'
+        self.assertIsNone(cache.open_content(url))
+        self.assertEqual([], list(cache.iter_lines(url)))
+
+        cache.update(url)
+
+        with cache.open_content(url) as content_file:
+            self.assertEqual(self.response_content, content_file.read())
+        with cache.open_content(url, encoding='utf-8') as content_file:
+            self.assertEqual(
+                self.response_content.decode('utf-8'), content_file.read())
+        self.assertEqual(
+            ['line 1', 'ligne 2 é'],
+            list(cache.iter_lines(url)))
+        self.assertEqual(
+            [b'line 1', 'ligne 2 é'.encode('utf-8')],
+            list(cache.iter_lines(url, encoding=None)))
+
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_iter_json_items(self, mock_requests):
+        """
+        Tests iterating over the items of a cached JSON document.
+        """
+        self.response_content = b'{"packages": [{"name": "a"}, {"name": "b"}]}'
+        self.set_mock_response(mock_requests)
+        cache = HttpCache(self.cache_directory)
+        url = 'http://example.com/data.json'
+        self.assertEqual([], list(cache.iter_json_items(url)))
+
+        cache.update(url)
+
+        self.assertEqual(
+            [{'name': 'a'}, {'name': 'b'}],
+            list(cache.iter_json_items(url, path=('packages',))))
+
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_get_resource_lines(self, mock_requests):
+        """
+        Tests that :func:`distro_tracker.core.utils.http.get_resource_lines`
+        retrieves the resource and iterates over its lines.
+        """
+        self.response_content = b'pkg1: fail\npkg2: pass\n'
+        self.set_mock_response(mock_requests)
+        cache = HttpCache(self.cache_directory)
+        url = 'http://example.com/sources.txt'
+
+        lines = get_resource_lines(url, cache)
+
+        self.assertEqual(['pkg1: fail', 'pkg2: pass'], list(lines))
+        self.assertIn(url, cache)
+
+    @override_settings(DISTRO_TRACKER_HTTP_CACHE_COMPRESS_MIN_SIZE=10)
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_update_compresses_text(self, mock_requests):
+        """
+        Tests that the text responses are stored compressed and transparently
+        decompressed when read.
+        """
+        self.set_mock_response(mock_requests, headers={
+            'Content-Type': 'text/plain; charset=utf-8',
+        })
+        cache = HttpCache(self.cache_directory)
+        url = 'http://example.com'
+
+        cache.update(url)
+
+        self.assertIn(
+            cache._url_hash(url) + '.gz', os.listdir(self.cache_directory))
+        self.assertEqual(cache.get_content(url), self.response_content)
+        self.assertEqual(
+            [self.response_content.decode('utf-8')],
+            list(cache.iter_lines(url)))
+
+        # A binary response replaces the compressed content
+        self.set_mock_response(mock_requests, headers={
+            'Content-Type': 'application/octet-stream',
+        })
+        cache.update(url)
+
+        file_names = os.listdir(self.cache_directory)
+        self.assertIn(cache._url_hash(url), file_names)
+        self.assertNotIn(cache._url_hash(url) + '.gz', file_names)
+        self.assertEqual(cache.get_content(url), self.response_content)
+
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_content_removed_behind_the_cache(self, mock_requests):
+        """
+        Tests that a response whose content file has been removed is dropped
+        from the index.
+        """
+        self.set_mock_response(mock_requests)
+        cache = HttpCache(self.cache_directory)
+        url = 'http://example.com'
+        cache.update(url)
+        os.remove(os.path.join(self.cache_directory, cache._url_hash(url)))
+
+        self.assertIsNone(cache.open_content(url))
+        self.assertNotIn(url, cache)
+
+    def test_index_legacy_entry(self):
+        """
+        Tests that a response stored with its headers in a separate file is
+        added to the index of the cache.
+        """
+        cache = HttpCache(self.cache_directory)
+        url = 'http://example.com'
+        path = os.path.join(self.cache_directory, cache._url_hash(url))
+        with open(path, 'wb') as content_file:
+            content_file.write(self.response_content)
+        with open(path + '.headers', 'w') as header_file:
+            header_file.write('{"Cache-Control": "max-age=3600"}')
+
+        self.assertIn(url, cache)
+        self.assertFalse(cache.is_expired(url))
+        self.assertEqual(cache.get_content(url), self.response_content)
+        entry = cache.index.get(cache._url_hash(url))
+        self.assertEqual(len(self.response_content), entry.size)
+        self.assertFalse(os.path.exists(path + '.headers'))
+
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_prune(self, mock_requests):
+        """
+        Tests that the least recently used responses are removed when the
+        cache grows bigger than its maximum size.
+        """
+        self.set_mock_response(mock_requests)
+        cache = HttpCache(self.cache_directory)
+        size = len(self.response_content)
+        urls = ['http://example.com/{}'.format(i) for i in range(3)]
+        for accessed, url in enumerate(urls):
+            cache.update(url)
+            entry = cache.index.get(cache._url_hash(url))
+            cache.index.save(entry._replace(accessed=accessed))
+        # The first response is used again
+        cache.index.save(
+            cache.index.get(cache._url_hash(urls[0]))._replace(accessed=10))
+
+        with override_settings(DISTRO_TRACKER_HTTP_CACHE_MAX_SIZE=2 * size):
+            self.assertEqual(1, cache.prune())
+
+        self.assertIn(urls[0], cache)
+        self.assertNotIn(urls[1], cache)
+        self.assertIn(urls[2], cache)
+        self.assertEqual(2 * size, cache.index.total_size())
+
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_update_uses_given_session(self, mock_requests):
+        """
+        Tests that the cache makes its requests with the session it was given.
+        """
+        self.set_mock_response(mock_requests)
+        session = mock.MagicMock()
+        session.get.return_value = \
+            mock_requests.Session.return_value.get.return_value
+        cache = HttpCache(self.cache_directory, session=session)
+        url = 'http://example.com'
+
+        cache.update(url)
+
+        session.get.assert_called_with(
+            url, verify=False, allow_redirects=True, timeout=mock.ANY,
+            stream=True,
+            headers={})
+        self.assertEqual(cache.get_content(url), self.response_content)
+
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_prefetch(self, mock_requests):
+        """
+        Tests that the result of prefetching a resource is given by the next
+        update of the resource instead of doing another request.
+        """
+        self.set_mock_response(mock_requests)
+        mock_get = mock_requests.Session.return_value.get
+        url = 'http://example.com'
+
+        with shared_http_session():
+            results = HttpCache(self.cache_directory).prefetch([url, url])
+            cache = HttpCache(self.cache_directory)
+            self.assertTrue(cache.is_expired(url))
+
+            response, updated = cache.update(url)
+
+        self.assertEqual(1, mock_get.call_count)
+        self.assertEqual((response, updated), results[url])
+        self.assertTrue(updated)
+        self.assertEqual(cache.get_content(url), self.response_content)
+
+    @override_settings(DISTRO_TRACKER_HTTP_HOST_CONCURRENCY=1)
+    def test_update_many(self):
+        """
+        Tests that the results of updating several resources are returned in
+        order, ``None`` standing for the resources which could not be
+        updated.
+        """
+        def get(url, **kwargs):
+            if url.endswith('broken'):
+                raise requests.exceptions.ConnectionError(url)
+            response = mock.MagicMock(status_code=200, ok=True, headers={})
+            response.iter_content.return_value = [url.encode('utf-8')]
+            return response
+        session = mock.MagicMock()
+        session.get.side_effect = get
+        cache = HttpCache(self.cache_directory, session=session)
+        urls = [
+            'http://example.com/1',
+            'http://example.com/broken',
+            'http://example.org/2',
+        ]
+
+        results = cache.update_many(urls)
+
+        self.assertEqual(3, len(results))
+        self.assertIsNone(results[1])
+        for url, result in zip(urls[::2], results[::2]):
+            response, updated = result
+            self.assertTrue(updated)
+            self.assertEqual(url.encode('utf-8'), cache.get_content(url))
+        self.assertNotIn(urls[1], cache)
+        # Only the connection of the current thread to the index is left
+        self.assertEqual(
+            [threading.current_thread()], list(cache.index._connections))
+
+    def test_host_slot_uses_the_current_concurrency_limit(self):
+        """
+        Tests that the concurrent requests to a host are limited by the
+        current value of the setting, not by the one used the first time a
+        request was made to the host.
+        """
+        url = 'http://slot.example.com/1'
+        with self.settings(DISTRO_TRACKER_HTTP_HOST_CONCURRENCY=1):
+            with http_utils._host_slot(url):
+                pass
+
+        with self.settings(DISTRO_TRACKER_HTTP_HOST_CONCURRENCY=2):
+            with http_utils._host_slot(url):
+                with http_utils._host_slot(url):
+                    semaphore = http_utils._host_semaphores[
+                        'slot.example.com', 2]
+                    self.assertFalse(semaphore.acquire(False))
+
+    def test_run_concurrently(self):
+        """
+        Tests that the results of the functions are gathered by key and that
+        the functions use the HTTP session of the calling thread.
+        """
+        with shared_http_session() as session:
+            results = run_concurrently({
+                'value': lambda: 1,
+                'session': lambda: HttpCache(self.cache_directory).session,
+            })
+
+        self.assertEqual({'value': 1, 'session': session}, results)
+
+    def test_run_concurrently_failure(self):
+        """
+        Tests that an exception raised by one of the functions is raised
+        again.
+        """
+        def fail():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            run_concurrently({'fail': fail, 'value': lambda: 1})
+
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_prefetch_skips_fresh_resources(self, mock_requests):
+        """
+        Tests that prefetching does not update the resources which are not
+        expired.
+        """
+        self.set_mock_response(mock_requests, headers={
+            'Cache-Control': 'max-age=3600',
+        })
+        mock_get = mock_requests.Session.return_value.get
+        url = 'http://example.com'
+        cache = HttpCache(self.cache_directory)
+        cache.update(url)
+
+        self.assertEqual({}, cache.prefetch([url]))
+        self.assertEqual(1, mock_get.call_count)
+
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_shared_http_session(self, mock_requests):
+        """
+        Tests that all caches share a single session within a
+        :class:`shared_http_session` block and that the session is closed
+        when leaving it.
+        """
+        sessions = [mock.MagicMock(), mock.MagicMock()]
+        mock_requests.Session.side_effect = sessions
+
+        with shared_http_session() as session:
+            self.assertIs(HttpCache(self.cache_directory).session, session)
+            self.assertIs(HttpCache(self.cache_directory).session, session)
+            with shared_http_session():
+                self.assertIs(HttpCache(self.cache_directory).session, session)
+            self.assertFalse(session.close.called)
+
+        session.close.assert_called_once_with()
+        # Outside of the block each cache gets its own session
+        self.assertIs(HttpCache(self.cache_directory).session, sessions[1])
+
     def test_get_resource_content_utlity_function_cached(self):
         """
         Tests the :func:`distro_tracker.core.utils.http.get_resource_content`
@@ -1093,6 +1689,119 @@ class HttpCacheTest(SimpleTestCase):
         # The function updated the cache
         mock_cache.update.assert_called_once_with(url)
 
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_get_resource_content_serves_stale_content_on_error(
+            self, mock_requests):
+        """
+        Tests that :func:`distro_tracker.core.utils.http.get_resource_content`
+        returns the stale content when the resource cannot be retrieved,
+        unless the content is older than the allowed maximum.
+        """
+        self.set_mock_response(mock_requests)
+        cache = HttpCache(self.cache_directory)
+        url = 'http://example.com'
+        cache.update(url)
+        mock_requests.Session.return_value.get.side_effect = (
+            requests.exceptions.ConnectionError)
+
+        self.assertEqual(self.response_content,
+                         get_resource_content(url, cache))
+
+        entry = cache.index.get(cache._url_hash(url))
+        cache.index.save(entry._replace(fetched=time.time() - 60))
+        with self.settings(DISTRO_TRACKER_HTTP_CACHE_MAX_STALE=10):
+            self.assertIsNone(get_resource_content(url, cache))
+
+    @mock.patch('distro_tracker.core.utils.http.requests')
+    def test_get_resource_content_keeps_content_on_server_error(
+            self, mock_requests):
+        """
+        Tests that a server error does not remove the cached content, which
+        is then returned by
+        :func:`distro_tracker.core.utils.http.get_resource_content`.
+        """
+        self.set_mock_response(mock_requests)
+        cache = HttpCache(self.cache_directory)
+        url = 'http://example.com'
+        cache.update(url)
+        self.set_mock_response(mock_requests, status_code=503)
+
+        content = get_resource_content(url, cache)
+
+        self.assertEqual(self.response_content, content)
+        self.assertIn(url, cache)
+
+        # A client error removes the cached content
+        self.set_mock_response(mock_requests, status_code=404)
+
+        self.assertIsNone(get_resource_content(url, cache))
+        self.assertNotIn(url, cache)
+
+
+class HttpFixturesAdapterTest(SimpleTestCase):
+    """
+    Tests for the :class:`distro_tracker.core.utils.http.HttpFixturesAdapter`
+    class.
+    """
+    def setUp(self):
+        self.fixtures_directory = tempfile.mkdtemp(suffix='test-fixtures')
+        self.url = 'http://example.com/resource'
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.fixtures_directory)
+
+    def get_session(self, mode):
+        session = requests.Session()
+        session.mount('http://', HttpFixturesAdapter(
+            self.fixtures_directory, mode))
+        return session
+
+    def recorded_response(self, request, **kwargs):
+        response = requests.models.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers = requests.structures.CaseInsensitiveDict({
+            'Content-Type': 'text/plain',
+            'Content-Encoding': 'identity',
+        })
+        response.raw = io.BytesIO(b'Recorded content')
+        response.url = request.url
+        response.request = request
+        return response
+
+    def test_record_and_replay(self):
+        """
+        Tests that a recorded response is replayed with validators which make
+        the conditional requests get a 304 response.
+        """
+        with mock.patch.object(requests.adapters.HTTPAdapter, 'send',
+                               self.recorded_response):
+            response = self.get_session('record').get(self.url)
+        self.assertEqual(b'Recorded content', response.content)
+
+        session = self.get_session('replay')
+        response = session.get(self.url)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b'Recorded content', response.content)
+        self.assertEqual('text/plain', response.headers['Content-Type'])
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(304, session.get(self.url, headers={
+            'If-None-Match': response.headers['ETag'],
+        }).status_code)
+        self.assertEqual(304, session.get(self.url, headers={
+            'If-Modified-Since': response.headers['Last-Modified'],
+        }).status_code)
+
+    def test_replay_missing_resource(self):
+        """
+        Tests that the resources which were not recorded are not found.
+        """
+        response = self.get_session('replay').get(self.url)
+
+        self.assertEqual(404, response.status_code)
+
 
 class VerifySignatureTest(SimpleTestCase):
     """
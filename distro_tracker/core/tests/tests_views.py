@@ -20,6 +20,8 @@ from distro_tracker.core.models import SourcePackageName, SourcePackage
 from distro_tracker.core.models import PackageName, PseudoPackageName
 from distro_tracker.core.models import News
 from distro_tracker.core.models import ActionItem, ActionItemType
+from distro_tracker.core.models import PackageCounters, Team
+from django_email_accounts.models import User
 import json
 
 from django.core.urlresolvers import reverse
@@ -477,6 +479,58 @@ class ActionItemJsonViewTest(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class TeamDetailsViewTest(TestCase):
+    """
+    Tests for the :class:`distro_tracker.core.views.TeamDetailsView`.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(
+            main_email='owner@domain.com', password='asdf')
+        self.team = Team.objects.create_with_slug(
+            owner=self.user, name='team')
+        self.package = SourcePackageName.objects.create(name='dummy-package')
+        self.other_package = SourcePackageName.objects.create(
+            name='other-package')
+        self.team.packages.add(self.package, self.other_package)
+        # Only the first package has action items
+        for severity in (ActionItem.SEVERITY_LOW, ActionItem.SEVERITY_HIGH):
+            ActionItem.objects.create(
+                package=self.package,
+                item_type=ActionItemType.objects.create(
+                    type_name='test-{}'.format(severity)),
+                severity=severity,
+                short_description='Description')
+        PackageCounters.objects.refresh()
+
+    def get_team_page(self):
+        return self.client.get(self.team.get_absolute_url())
+
+    def test_packages_with_counters(self):
+        """
+        Tests that the team packages are listed with their counters of action
+        items.
+        """
+        response = self.get_team_page()
+
+        self.assertEqual(
+            [self.package, self.other_package],
+            list(response.context['team_packages']))
+        self.assertContains(response, 'class="label label-default')
+        self.assertContains(response, '2 action items, highest severity: high')
+
+    def test_package_counters_in_one_query(self):
+        """
+        Tests that the counters are fetched with the team packages.
+        """
+        response = self.get_team_page()
+
+        packages = response.context['team_packages']
+        with self.assertNumQueries(0):
+            for package in packages:
+                if package == self.package:
+                    self.assertEqual(2, package.counters.action_item_count)
+
+
 class NewsViewTest(TestCase, TemplateTestsMixin):
     """
     Tests for the :class:`distro_tracker.core.views.PackageNews`.
@@ -15,18 +15,26 @@ from django.db import models
 from django.utils import six
 from django.conf import settings
 import os
+import re
 import json
+import codecs
+import collections
+import hashlib
 import lzma
+import yaml
 import gpgme
 import tarfile
 import contextlib
 import datetime
+import logging
 
 # Re-export some functions
 from .email_messages import extract_email_address_from_header  # noqa
 from .email_messages import get_decoded_message_payload        # noqa
 from .email_messages import message_from_bytes                 # noqa
 
+logger = logging.getLogger(__name__)
+
 
 def get_or_none(model, **kwargs):
     """
@@ -77,6 +85,386 @@ def render_to_json_response(response):
     )
 
 
+def get_data_checksum(data):
+    """
+    Computes a checksum of JSON-serializable data.
+
+    The checksum does not depend on the order of the keys of the
+    dictionaries found in the data.
+
+    :param data: The data for which the checksum is computed.
+
+    :returns: The hexadecimal MD5 digest of the data's JSON representation.
+    :rtype: string
+    """
+    json_dump = json.dumps(data, sort_keys=True)
+    if not isinstance(json_dump, six.binary_type):
+        json_dump = json_dump.encode('UTF-8')
+    return hashlib.md5(json_dump).hexdigest()
+
+
+def iter_json_items(stream, path=(), chunk_size=64 * 1024):
+    """
+    Iterates over the members of a JSON object, or the elements of a JSON
+    array, read from the given file, without loading the whole document in
+    memory: only one member is decoded at a time.
+
+    :param stream: A file object opened in text mode, or in binary mode if
+        the content is encoded in UTF-8.
+    :param path: The keys leading to the object or array to iterate over, when
+        it is nested in other objects. For instance ``('packages',)`` to
+        iterate over the array found in ``{"packages": [...]}``. Nothing is
+        yielded if one of the keys is missing.
+    :param chunk_size: The number of characters read from the file at once.
+
+    :returns: An iterator of ``(key, value)`` pairs for an object, or of
+        values for an array.
+    :raises ValueError: If the content is not valid JSON.
+    """
+    reader = _JsonStreamReader(stream, chunk_size)
+    for step in path:
+        for key in reader.iter_container():
+            if key == step:
+                break
+            reader.decode()
+        else:
+            return
+
+    is_object = reader.peek() == '{'
+    for key in reader.iter_container():
+        value = reader.decode()
+        yield (key, value) if is_object else value
+
+
+class _JsonStreamReader(object):
+    """
+    Reads the JSON tokens of a file, keeping in memory only the value being
+    decoded.
+    """
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = None
+
+    def _fill(self, size=None):
+        """
+        Appends the next characters of the file to the buffer, dropping the
+        characters already consumed.
+
+        :returns: ``False`` if the end of the file is reached.
+        """
+        if self.eof:
+            return False
+        data = self.stream.read(size or self.chunk_size)
+        if isinstance(data, six.binary_type):
+            if self.text_decoder is None:
+                self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+            data = self.text_decoder.decode(data, final=not data)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + data
+        self.position = 0
+        return True
+
+    def peek(self):
+        """
+        Skips the whitespace and returns the next character, without
+        consuming it. An empty string is returned at the end of the file.
+        """
+        while True:
+            self.position = self.WHITESPACE.match(
+                self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                return ''
+
+    def expect(self, characters):
+        """
+        Consumes the next character, which must be one of the given ones.
+        """
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError('Expected one of {!r} instead of {!r}'.format(
+                characters, character))
+        self.position += 1
+        return character
+
+    def decode(self):
+        """
+        Decodes and consumes the next JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(
+                    self.buffer, self.position)
+            except ValueError:
+                # The value is incomplete, read more of it: doubling the
+                # buffer keeps decoding large values linear.
+                if not self._fill(max(self.chunk_size, len(self.buffer))):
+                    raise
+                continue
+            if end == len(self.buffer) and \
+                    self._fill(max(self.chunk_size, len(self.buffer))):
+                # A number might continue after the end of the buffer
+                continue
+            self.position = end
+            return value
+
+    def iter_container(self):
+        """
+        Consumes the opening of an object or of an array and yields the key
+        of each of its members or the index of each of its elements. The
+        caller has to consume the value before getting the next key.
+        """
+        opening = self.expect('{[')
+        closing = '}' if opening == '{' else ']'
+        if self.peek() == closing:
+            self.position += 1
+            return
+        index = 0
+        while True:
+            if opening == '{':
+                key = self.decode()
+                self.expect(':')
+            else:
+                key = index
+            yield key
+            index += 1
+            if self.expect(',' + closing) == closing:
+                return
+
+
+def iter_yaml_items(stream, path=()):
+    """
+    Iterates over the entries of a YAML mapping, or the elements of a YAML
+    sequence, read from the given file, without loading the whole document
+    in memory: the document is parsed as a stream of events and only one
+    entry is constructed at a time.
+
+    Only the first document of the stream is read and the entries cannot
+    refer to anchors defined outside of them.
+
+    :param stream: A file object, or a string.
+    :param path: The keys leading to the mapping or sequence to iterate over,
+        when it is nested in other mappings. For instance ``('sources',)`` to
+        iterate over the sequence found in ``{sources: [...]}``. Nothing is
+        yielded if one of the keys is missing.
+
+    :returns: An iterator of ``(key, value)`` pairs for a mapping, or of
+        values for a sequence.
+    :raises yaml.YAMLError: If the content is not valid YAML.
+    """
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    events = yaml.parse(stream, Loader=loader)
+    node_event = _find_yaml_node(events, path)
+
+    if isinstance(node_event, yaml.MappingStartEvent):
+        while True:
+            key_event = next(events)
+            if isinstance(key_event, yaml.MappingEndEvent):
+                return
+            key = _construct_yaml_node(_read_yaml_node(key_event, events))
+            value = _construct_yaml_node(_read_yaml_node(next(events), events))
+            yield key, value
+    elif isinstance(node_event, yaml.SequenceStartEvent):
+        while True:
+            event = next(events)
+            if isinstance(event, yaml.SequenceEndEvent):
+                return
+            yield _construct_yaml_node(_read_yaml_node(event, events))
+
+
+def _find_yaml_node(events, path):
+    """
+    Reads the events of the first YAML document until the start of the node
+    found at the given path.
+
+    :returns: The first event of the node, or ``None`` if there is no such
+        node.
+    """
+    for event in events:
+        if isinstance(event, yaml.DocumentStartEvent):
+            break
+    else:
+        return None
+    node_event = next(events)
+
+    for step in path:
+        if not isinstance(node_event, yaml.MappingStartEvent):
+            return None
+        while True:
+            key_event = next(events)
+            if isinstance(key_event, yaml.MappingEndEvent):
+                return None
+            if isinstance(key_event, yaml.ScalarEvent) and \
+                    key_event.value == step:
+                node_event = next(events)
+                break
+            _read_yaml_node(key_event, events, keep=False)
+            _read_yaml_node(next(events), events, keep=False)
+    return node_event
+
+
+def _read_yaml_node(first_event, events, keep=True):
+    """
+    Reads the events of the YAML node starting with the given event.
+
+    :param keep: Whether the events should be returned or discarded.
+    :returns: The list of the events of the node, if they are kept.
+    """
+    node_events = [first_event] if keep else None
+    if isinstance(first_event, yaml.CollectionStartEvent):
+        depth = 1
+        while depth:
+            event = next(events)
+            if keep:
+                node_events.append(event)
+            if isinstance(event, yaml.CollectionStartEvent):
+                depth += 1
+            elif isinstance(event, yaml.CollectionEndEvent):
+                depth -= 1
+    return node_events
+
+
+class _YamlEventsLoader(yaml.composer.Composer,
+                        yaml.constructor.SafeConstructor,
+                        yaml.resolver.Resolver):
+    """
+    Constructs a Python object from the events of a single YAML node.
+    """
+    def __init__(self, events):
+        yaml.composer.Composer.__init__(self)
+        yaml.constructor.SafeConstructor.__init__(self)
+        yaml.resolver.Resolver.__init__(self)
+        self.events = collections.deque(events)
+
+    def check_event(self, *choices):
+        if not self.events:
+            return False
+        return not choices or isinstance(self.events[0], choices)
+
+    def peek_event(self):
+        return self.events[0]
+
+    def get_event(self):
+        return self.events.popleft()
+
+
+def _construct_yaml_node(events):
+    loader = _YamlEventsLoader(events)
+    return loader.construct_document(loader.compose_node(None, None))
+
+
+class LineRecordParser(object):
+    """
+    Parses the records of a line-oriented text feed, one record per line,
+    as the lines are read: the lines can come straight from
+    :meth:`HttpCache.iter_lines
+    <distro_tracker.core.utils.http.HttpCache.iter_lines>` without loading
+    the whole feed in memory.
+
+    Each line is split on the separator and its values are assigned to the
+    declared fields, in order. The values found after the last declared
+    field are ignored.
+
+    The lines which cannot be parsed are skipped and counted in
+    :attr:`errors`, and a warning is logged once all the lines have been
+    parsed if there were some. Blank lines are silently skipped.
+
+    :param fields: The fields of a record. Each one is either its name or a
+        ``(name, converter)`` pair, where ``converter`` turns the text of the
+        field into its value (e.g. ``int``) and raises :exc:`ValueError` if
+        it is invalid. The fields named ``None`` are left out of the records.
+    :param separator: The separator of the fields: ``None`` for whitespace,
+        a string, or a compiled regular expression.
+    :param min_fields: The number of values a line needs to contain to be
+        valid. Defaults to the number of fields; the fields missing from
+        shorter lines are left out of their record.
+    :param name: The name of the feed used in the log messages, e.g. its URL.
+    """
+    def __init__(self, fields, separator=None, min_fields=None, name=None):
+        self.fields = [
+            field if isinstance(field, tuple) else (field, None)
+            for field in fields
+        ]
+        self.separator = separator
+        if min_fields is None:
+            min_fields = len(self.fields)
+        self.min_fields = min_fields
+        self.name = name
+        #: The number of records parsed so far
+        self.records = 0
+        #: The number of lines skipped because they could not be parsed
+        self.errors = 0
+
+    def split(self, line):
+        """
+        :returns: The values found in the given line.
+        :rtype: list
+        """
+        maxsplit = len(self.fields)
+        if self.separator is None or \
+                isinstance(self.separator, six.string_types):
+            return line.split(self.separator, maxsplit)
+        return self.separator.split(line, maxsplit)
+
+    def parse_line(self, line):
+        """
+        :returns: The record found in the given line.
+        :rtype: dict
+        :raises ValueError: If the line is not valid.
+        """
+        values = self.split(line.strip())
+        if len(values) < self.min_fields:
+            raise ValueError('{count} field(s) instead of {min_fields}'.format(
+                count=len(values), min_fields=self.min_fields))
+
+        record = {}
+        for (name, converter), value in zip(self.fields, values):
+            if name is None:
+                continue
+            value = value.strip()
+            record[name] = value if converter is None else converter(value)
+        return record
+
+    def parse(self, lines):
+        """
+        Iterates over the records found in the given lines.
+
+        :param lines: An iterable of lines, with or without their line
+            terminators.
+
+        :returns: An iterator of dicts mapping the field names to their
+            values.
+        """
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = self.parse_line(line)
+            except ValueError as exc:
+                self.errors += 1
+                logger.debug('Invalid line in %s (%s): %r',
+                             self.name or 'feed', exc, line)
+                continue
+            self.records += 1
+            yield record
+
+        if self.errors:
+            logger.warning('Skipped %d invalid line(s) out of %d in %s',
+                           self.errors, self.errors + self.records,
+                           self.name or 'feed')
+
+
 class PrettyPrintList(object):
     """
     A class which wraps the built-in :class:`list` object so that when it is
@@ -12,16 +12,45 @@ Utilities for handling HTTP resource access.
 """
 
 from __future__ import unicode_literals
+from functools import wraps
 from hashlib import md5
 from django.utils import timezone
 from django.utils.http import parse_http_date
 from django.conf import settings
+from django.utils.six.moves.urllib.parse import urlparse
+from email.utils import formatdate
+from multiprocessing.pool import ThreadPool
+import collections
+import contextlib
+import copy
+import errno
+import gzip
+import io
+import logging
 import os
+import sqlite3
+import tempfile
+import threading
 import time
 import json
+from requests.packages.urllib3.util.retry import Retry
 from requests.structures import CaseInsensitiveDict
 import requests
 
+from distro_tracker.core.utils import iter_json_items
+from distro_tracker.core.utils import iter_yaml_items
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+# The semaphores limiting the concurrent requests to each host, keyed on the
+# host and the limit, and the time of the last request started to each host,
+# see _host_slot()
+_host_semaphores = {}
+_host_last_request = {}
+_hosts_lock = threading.Lock()
+
 
 def parse_cache_control_header(header):
     """
@@ -45,33 +74,494 @@ def parse_cache_control_header(header):
     return cache_control
 
 
+def create_http_session():
+    """
+    Creates a :class:`requests.Session` keeping the connections alive in
+    per-host pools of
+    :data:`DISTRO_TRACKER_HTTP_POOL_SIZE
+    <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_POOL_SIZE>`
+    connections and retrying the requests which fail because of a connection
+    error or a server error
+    :data:`DISTRO_TRACKER_HTTP_RETRIES
+    <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_RETRIES>` times.
+
+    :rtype: :class:`requests.Session`
+    """
+    pool_size = getattr(settings, 'DISTRO_TRACKER_HTTP_POOL_SIZE', 10)
+    retries = Retry(
+        total=getattr(settings, 'DISTRO_TRACKER_HTTP_RETRIES', 3),
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        # Give back the last response instead of raising an exception
+        raise_on_status=False)
+    adapter_kwargs = dict(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retries)
+    fixtures_mode = getattr(settings, 'DISTRO_TRACKER_HTTP_FIXTURES_MODE',
+                            None)
+    if fixtures_mode:
+        adapter = HttpFixturesAdapter(
+            settings.DISTRO_TRACKER_HTTP_FIXTURES_DIRECTORY, fixtures_mode,
+            **adapter_kwargs)
+    else:
+        adapter = requests.adapters.HTTPAdapter(**adapter_kwargs)
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class HttpFixturesAdapter(requests.adapters.HTTPAdapter):
+    """
+    A :mod:`requests` transport adapter which records the responses to the
+    GET requests in a fixtures directory (``'record'`` mode) or serves them
+    back from this directory without any network access (``'replay'`` mode).
+
+    The replayed responses carry an ``ETag`` and a ``Last-Modified`` header,
+    those of the recorded response or generated ones, and conditional
+    requests get a 304 response, so that the whole update cycle of the
+    :class:`HttpCache` can be reproduced offline. The resources missing from
+    the fixtures get a 404 response.
+
+    It is used by the sessions created by :func:`create_http_session` when
+    the :data:`DISTRO_TRACKER_HTTP_FIXTURES_MODE
+    <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_FIXTURES_MODE>`
+    setting is set.
+    """
+    #: The headers describing the encoding of the recorded body, which is
+    #: stored decoded
+    TRANSPORT_HEADERS = ('content-encoding', 'content-length',
+                         'transfer-encoding', 'connection', 'keep-alive')
+
+    def __init__(self, directory, mode, **kwargs):
+        if mode not in ('record', 'replay'):
+            raise ValueError("Unknown HTTP fixtures mode: {}".format(mode))
+        super(HttpFixturesAdapter, self).__init__(**kwargs)
+        self.directory = directory
+        self.mode = mode
+        self._lock = threading.Lock()
+
+    def _fixture_path(self, url):
+        return os.path.join(self.directory,
+                            md5(url.encode('utf-8')).hexdigest())
+
+    def send(self, request, **kwargs):
+        if self.mode == 'replay':
+            return self.replay(request)
+        response = super(HttpFixturesAdapter, self).send(request, **kwargs)
+        if request.method == 'GET':
+            self.record(request.url, response)
+        return response
+
+    def record(self, url, response):
+        """
+        Stores the given response to a GET request of the given URL in the
+        fixtures directory.
+        """
+        headers = dict(
+            (name, value) for name, value in response.headers.items()
+            if name.lower() not in self.TRANSPORT_HEADERS)
+        path = self._fixture_path(url)
+        with self._lock:
+            if not os.path.exists(self.directory):
+                os.makedirs(self.directory)
+            with open(path, 'wb') as content_file:
+                content_file.write(response.content)
+            with open(path + '.json', 'w') as metadata_file:
+                json.dump({
+                    'url': url,
+                    'status_code': response.status_code,
+                    'reason': response.reason,
+                    'headers': headers,
+                    'recorded': time.time(),
+                }, metadata_file, indent=2, sort_keys=True)
+
+    def replay(self, request):
+        """
+        Builds the response to the given request from the fixtures
+        directory.
+        """
+        if request.method not in ('GET', 'HEAD'):
+            raise requests.exceptions.ConnectionError(
+                "{} requests cannot be replayed".format(request.method),
+                request=request)
+        path = self._fixture_path(request.url)
+        try:
+            with open(path + '.json') as metadata_file:
+                metadata = json.load(metadata_file)
+            with open(path, 'rb') as content_file:
+                content = content_file.read()
+        except EnvironmentError:
+            return self._build_replayed_response(
+                request, 404, 'Not Found', CaseInsensitiveDict(), b'')
+
+        headers = CaseInsensitiveDict(metadata['headers'])
+        headers.setdefault('ETag', '"{}"'.format(md5(content).hexdigest()))
+        headers.setdefault('Last-Modified', formatdate(
+            metadata['recorded'], usegmt=True))
+        if metadata['status_code'] == 200 and self._is_not_modified(
+                request, headers):
+            return self._build_replayed_response(
+                request, 304, 'Not Modified', headers, b'')
+        headers['Content-Length'] = str(len(content))
+        if request.method == 'HEAD':
+            content = b''
+        return self._build_replayed_response(
+            request, metadata['status_code'], metadata['reason'], headers,
+            content)
+
+    def _is_not_modified(self, request, headers):
+        if 'If-None-Match' in request.headers:
+            return request.headers['If-None-Match'] == headers['ETag']
+        if 'If-Modified-Since' in request.headers:
+            try:
+                last_modified = parse_http_date(headers['Last-Modified'])
+                return last_modified <= parse_http_date(
+                    request.headers['If-Modified-Since'])
+            except ValueError:
+                return False
+        return False
+
+    def _build_replayed_response(self, request, status_code, reason,
+                                 headers, content):
+        response = requests.models.Response()
+        response.status_code = status_code
+        response.reason = reason
+        response.headers = headers
+        response.encoding = requests.utils.get_encoding_from_headers(headers)
+        response.raw = io.BytesIO(content)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+def get_shared_http_session():
+    """
+    Returns the HTTP session shared by the code running in the current thread
+    within a :class:`shared_http_session` block, ``None`` outside of such a
+    block.
+
+    :rtype: :class:`requests.Session`
+    """
+    return getattr(_state, 'session', None)
+
+
+class shared_http_session(object):
+    """
+    A context manager (which can also be used as a decorator) making all
+    :class:`HttpCache` instances created without an explicit session share a
+    single HTTP session, so that the connections to a host are reused by
+    all requests made within the block.
+
+    The responses obtained by :meth:`HttpCache.prefetch` within the block are
+    kept until a task asks for them with :meth:`HttpCache.update`.
+
+    The session is closed when leaving the outermost block.
+    """
+    def __enter__(self):
+        if not getattr(_state, 'depth', 0):
+            _state.session = create_http_session()
+            _state.prefetched = {}
+        _state.depth = getattr(_state, 'depth', 0) + 1
+        return _state.session
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _state.depth -= 1
+        if not _state.depth:
+            _state.session.close()
+            _state.session = None
+            _state.prefetched = None
+
+    def __call__(self, function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with shared_http_session():
+                return function(*args, **kwargs)
+        return wrapper
+
+
+#: The metadata of a response stored in the :class:`HttpCacheIndex`
+HttpCacheEntry = collections.namedtuple(
+    'HttpCacheEntry',
+    ['url_hash', 'url', 'headers', 'file_name', 'size', 'fetched',
+     'accessed'])
+
+
+class HttpCacheIndex(object):
+    """
+    The index of the responses stored in a :class:`HttpCache`, kept in a
+    SQLite database in the cache directory.
+
+    It holds the headers, the fetch time, the size and the time of the last
+    access of each response so that a cache lookup is a single query.
+    """
+    FILE_NAME = 'http-cache.sqlite3'
+
+    #: The minimum number of seconds between two recordings of an access to
+    #: the same response
+    ACCESS_RESOLUTION = 60
+
+    def __init__(self, cache_directory_path):
+        self.path = os.path.join(cache_directory_path, self.FILE_NAME)
+        # The SQLite connections cannot be shared between threads: each
+        # thread gets its own, kept until close() is called
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self):
+        thread = threading.current_thread()
+        connection = self._connections.get(thread)
+        if connection is None:
+            # The connection is only used by this thread, but it may be
+            # closed by another one
+            connection = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            with connection:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS entries ('
+                    ' url_hash TEXT PRIMARY KEY,'
+                    ' url TEXT NOT NULL,'
+                    ' headers TEXT NOT NULL,'
+                    ' file_name TEXT NOT NULL,'
+                    ' size INTEGER NOT NULL,'
+                    ' fetched REAL NOT NULL,'
+                    ' accessed REAL NOT NULL)')
+                connection.execute(
+                    'CREATE INDEX IF NOT EXISTS entries_accessed'
+                    ' ON entries (accessed)')
+            with self._lock:
+                self._connections[thread] = connection
+        return connection
+
+    def close(self, threads=None):
+        """
+        Closes the connections to the index database.
+
+        :param threads: The threads whose connections are closed. All the
+            connections are closed when it is ``None``.
+        :type threads: ``iterable`` of :class:`threading.Thread`
+        """
+        with self._lock:
+            if threads is None:
+                threads = list(self._connections)
+            connections = [
+                self._connections.pop(thread)
+                for thread in threads
+                if thread in self._connections
+            ]
+        for connection in connections:
+            connection.close()
+
+    def _make_entry(self, row):
+        values = list(row)
+        values[2] = json.loads(values[2])
+        return HttpCacheEntry(*values)
+
+    def get(self, url_hash):
+        """
+        :returns: The entry of the response with the given URL hash, ``None``
+            if there is none.
+        :rtype: :class:`HttpCacheEntry`
+        """
+        row = self.connection.execute(
+            'SELECT * FROM entries WHERE url_hash = ?', (url_hash,)).fetchone()
+        if row is not None:
+            return self._make_entry(row)
+
+    def all(self):
+        """
+        :returns: All entries, the least recently accessed first.
+        :rtype: ``iterable`` of :class:`HttpCacheEntry`
+        """
+        rows = self.connection.execute(
+            'SELECT * FROM entries ORDER BY accessed')
+        return [self._make_entry(row) for row in rows]
+
+    def save(self, entry):
+        """
+        Adds the given entry to the index, replacing the previous entry of
+        the same response.
+        """
+        values = list(entry)
+        values[2] = json.dumps(values[2])
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                values)
+
+    def touch(self, url_hash):
+        """
+        Records an access to the response with the given URL hash.
+        """
+        now = time.time()
+        with self.connection:
+            self.connection.execute(
+                'UPDATE entries SET accessed = ?'
+                ' WHERE url_hash = ? AND accessed < ?',
+                (now, url_hash, now - self.ACCESS_RESOLUTION))
+
+    def delete(self, url_hash):
+        """
+        Removes the entry of the response with the given URL hash.
+        """
+        with self.connection:
+            self.connection.execute(
+                'DELETE FROM entries WHERE url_hash = ?', (url_hash,))
+
+    def total_size(self):
+        """
+        :returns: The sum of the sizes of all the stored responses, in bytes
+        """
+        size, = self.connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()
+        return size
+
+
+@contextlib.contextmanager
+def _host_slot(url):
+    """
+    Waits until a request to the host of the given URL can be made without
+    having more than :data:`DISTRO_TRACKER_HTTP_HOST_CONCURRENCY
+    <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_HOST_CONCURRENCY>`
+    concurrent requests to this host nor starting them less than
+    :data:`DISTRO_TRACKER_HTTP_HOST_DELAY
+    <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_HOST_DELAY>`
+    seconds apart.
+    """
+    host = urlparse(url).netloc
+    # The settings are read on each call so that changing them is honoured
+    limit = getattr(settings, 'DISTRO_TRACKER_HTTP_HOST_CONCURRENCY', 4)
+    with _hosts_lock:
+        semaphore = _host_semaphores.get((host, limit))
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(limit)
+            _host_semaphores[host, limit] = semaphore
+
+    with semaphore:
+        delay = getattr(settings, 'DISTRO_TRACKER_HTTP_HOST_DELAY', 0)
+        if delay:
+            with _hosts_lock:
+                start = max(time.time(),
+                            _host_last_request.get(host, 0) + delay)
+                _host_last_request[host] = start
+            time.sleep(max(0, start - time.time()))
+        yield
+
+
+def _get_compress_min_size():
+    return getattr(
+        settings, 'DISTRO_TRACKER_HTTP_CACHE_COMPRESS_MIN_SIZE', 16 * 1024)
+
+
 class HttpCache(object):
     """
     A class providing an interface to a cache of HTTP responses.
+
+    The responses are streamed to the cache, they are never held entirely
+    in memory. Their content can be read with :meth:`get_content` or, for
+    large resources, with :meth:`open_content` and :meth:`iter_lines`.
+
+    Large text responses are stored gzip compressed (see
+    :data:`DISTRO_TRACKER_HTTP_CACHE_COMPRESS_MIN_SIZE
+    <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_CACHE_COMPRESS_MIN_SIZE>`)
+    and transparently decompressed when read.
+
+    :param cache_directory_path: The directory where the responses are stored
+    :param session: The HTTP session used to make the requests. When not
+        given, the session of the enclosing :class:`shared_http_session`
+        block is used or, outside of such a block, one created by
+        :func:`create_http_session` for this cache.
+    :type session: :class:`requests.Session`
     """
-    def __init__(self, cache_directory_path):
+    #: The size of the chunks in which the responses are downloaded
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, cache_directory_path, session=None):
         self.cache_directory_path = cache_directory_path
+        self._session = session
+        self.index = HttpCacheIndex(cache_directory_path)
+
+    @property
+    def session(self):
+        """
+        The :class:`requests.Session` used by this cache.
+        """
+        if self._session is not None:
+            return self._session
+        shared_session = get_shared_http_session()
+        if shared_session is not None:
+            return shared_session
+        self._session = create_http_session()
+        return self._session
 
     def __contains__(self, item):
-        cache_file_name = self._content_cache_file_path(item)
-        return os.path.exists(cache_file_name)
+        return self._get_entry(item) is not None
+
+    def _get_entry(self, url):
+        """
+        :returns: The index entry of the cached response for the given URL,
+            ``None`` if the response is not cached.
+        :rtype: :class:`HttpCacheEntry`
+        """
+        url_hash = self._url_hash(url)
+        entry = self.index.get(url_hash)
+        if entry is None:
+            entry = self._index_legacy_entry(url)
+        return entry
+
+    def _index_legacy_entry(self, url):
+        """
+        Adds to the index a response stored by a previous version of the
+        cache, along with its headers in a separate file.
+        """
+        path = self._find_content_cache_file(url)
+        header_path = self._header_cache_file_path(url)
+        if path is None or not os.path.exists(header_path):
+            return None
+        with open(header_path, 'r') as header_file:
+            headers = json.load(header_file)
+        fetched = os.stat(header_path).st_mtime
+        entry = HttpCacheEntry(
+            url_hash=self._url_hash(url),
+            url=url,
+            headers=headers,
+            file_name=os.path.basename(path),
+            size=os.path.getsize(path),
+            fetched=fetched,
+            accessed=fetched)
+        self.index.save(entry)
+        os.remove(header_path)
+        return entry
 
     def is_expired(self, url):
         """
         If the cached response for the given URL is expired based on
         Cache-Control or Expires headers, returns True.
+
+        A resource updated by :meth:`prefetch` is also reported as expired
+        until the next :meth:`update` of its URL has returned the result of
+        the prefetch. The code which only updates expired resources thus
+        still learns whether the prefetch changed the resource, without any
+        other request being made.
         """
-        if url not in self:
+        entry = self._get_entry(url)
+        if entry is None:
+            return True
+        if url in (getattr(_state, 'prefetched', None) or {}):
             return True
-        headers = self.get_headers(url)
+        headers = CaseInsensitiveDict(entry.headers)
 
         # First check if the Cache-Control header has set a max-age
         if 'cache-control' in headers:
             cache_control = parse_cache_control_header(headers['cache-control'])
             if 'max-age' in cache_control:
                 max_age = int(cache_control['max-age'])
-                response_age = int(
-                    os.stat(self._header_cache_file_path(url)).st_mtime)
+                response_age = int(entry.fetched)
                 current_timestamp = int(time.time())
 
                 return current_timestamp - response_age >= max_age
@@ -88,25 +578,126 @@ class HttpCache(object):
         # If there is no cache freshness date consider the item expired
         return True
 
+    def get_age(self, url):
+        """
+        Returns the number of seconds elapsed since the cached response for
+        the given URL was fetched, ``None`` if the response is not cached.
+        """
+        entry = self._get_entry(url)
+        if entry is not None:
+            return time.time() - entry.fetched
+
     def get_content(self, url):
         """
         Returns the content of the cached response for the given URL.
 
         :rtype: :class:`bytes`
         """
-        if url in self:
-            with open(self._content_cache_file_path(url), 'rb') as content_file:
+        content_file = self.open_content(url)
+        if content_file is not None:
+            with content_file:
                 return content_file.read()
 
+    def open_content(self, url, encoding=None):
+        """
+        Opens the content of the cached response for the given URL, so that
+        it can be processed without reading it entirely in memory.
+
+        :param encoding: The encoding of the content. If it is given, the
+            file is opened in text mode, otherwise in binary mode.
+
+        :returns: A file object which the caller has to close, or ``None``
+            if the response is not cached.
+        """
+        entry = self._get_entry(url)
+        if entry is None:
+            return None
+        path = os.path.join(self.cache_directory_path, entry.file_name)
+        compressed = path.endswith('.gz')
+        try:
+            if compressed:
+                content_file = gzip.GzipFile(path, 'rb')
+            else:
+                content_file = io.open(path, 'rb')
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            # Removed behind the back of the cache
+            self.index.delete(entry.url_hash)
+            return None
+        self.index.touch(entry.url_hash)
+        if encoding is None:
+            return content_file
+        if compressed:
+            content_file = io.BufferedReader(content_file)
+        return io.TextIOWrapper(
+            content_file, encoding=encoding, errors='replace', newline='')
+
+    def iter_lines(self, url, encoding='utf-8'):
+        """
+        Iterates over the lines of the cached response for the given URL,
+        without their line terminators.
+
+        :param encoding: The encoding of the content. If ``None``, the lines
+            are given as bytes.
+
+        :rtype: an iterator of :class:`str` (or :class:`bytes` if no encoding
+            is given). It is empty if the response is not cached.
+        """
+        content_file = self.open_content(url, encoding)
+        if content_file is None:
+            return
+        with content_file:
+            for line in content_file:
+                yield line.rstrip('\r\n' if encoding else b'\r\n')
+
+    def iter_json_items(self, url, path=()):
+        """
+        Iterates over the members of the JSON object, or the elements of the
+        JSON array, found in the cached response for the given URL, decoding
+        one of them at a time.
+
+        See :func:`iter_json_items <distro_tracker.core.utils.iter_json_items>`
+        for the meaning of ``path``.
+
+        :returns: An iterator of ``(key, value)`` pairs for an object, or of
+            values for an array. It is empty if the response is not cached.
+        """
+        content_file = self.open_content(url, encoding='utf-8')
+        if content_file is None:
+            return
+        with content_file:
+            for item in iter_json_items(content_file, path):
+                yield item
+
+    def iter_yaml_items(self, url, path=()):
+        """
+        Iterates over the entries of the YAML mapping, or the elements of the
+        YAML sequence, found in the cached response for the given URL,
+        constructing one of them at a time.
+
+        See :func:`iter_yaml_items <distro_tracker.core.utils.iter_yaml_items>`
+        for the meaning of ``path``.
+
+        :returns: An iterator of ``(key, value)`` pairs for a mapping, or of
+            values for a sequence. It is empty if the response is not cached.
+        """
+        content_file = self.open_content(url, encoding='utf-8')
+        if content_file is None:
+            return
+        with content_file:
+            for item in iter_yaml_items(content_file, path):
+                yield item
+
     def get_headers(self, url):
         """
         Returns the HTTP headers of the cached response for the given URL.
 
         :rtype: dict
         """
-        if url in self:
-            with open(self._header_cache_file_path(url), 'r') as header_file:
-                return CaseInsensitiveDict(json.load(header_file))
+        entry = self._get_entry(url)
+        if entry is not None:
+            return CaseInsensitiveDict(entry.headers)
         else:
             return {}
 
@@ -115,8 +706,8 @@ class HttpCache(object):
         Removes the cached response for the given URL.
         """
         if url in self:
-            os.remove(self._content_cache_file_path(url))
-            os.remove(self._header_cache_file_path(url))
+            self._remove_content_cache_files(url)
+            self.index.delete(self._url_hash(url))
 
     def update(self, url, force=False):
         """
@@ -128,9 +719,18 @@ class HttpCache(object):
             the parameter to ``True``
 
         :returns: The original HTTP response and a Boolean indicating whether
-            the cached value was updated.
+            the cached value was updated. When the response is successful,
+            its content has been consumed by the cache and has to be read
+            from it, with :meth:`get_content`, :meth:`open_content` or
+            :meth:`iter_lines`.
         :rtype: two-tuple of (:class:`requests.Response`, ``Boolean``)
         """
+        # The resource may have just been revalidated by prefetch()
+        prefetched = getattr(_state, 'prefetched', None) or {}
+        result, forced = prefetched.pop(url, (None, False))
+        if result is not None and (forced or not force):
+            return result
+
         cached_headers = self.get_headers(url)
         headers = {}
         if not force:
@@ -142,23 +742,239 @@ class HttpCache(object):
             # Ask all possible intermediate proxies to return a fresh response
             headers['Cache-Control'] = 'no-cache'
 
-        response = requests.get(url, headers=headers, verify=False,
-                                allow_redirects=True)
+        response = self._request(url, headers)
 
-        # Invalidate previously cached value if the response is not valid now
-        if not response.ok:
-            self.remove(url)
-        elif response.status_code == 200:
+        if response.status_code == 200:
             # Dump the content and headers only if a new response is generated
-            with open(self._content_cache_file_path(url), 'wb') as content_file:
-                content_file.write(response.content)
-            with open(self._header_cache_file_path(url), 'w') as header_file:
-                json.dump(dict(response.headers), header_file)
+            path = self._write_content(
+                url, response.iter_content(self.CHUNK_SIZE),
+                compress=self._should_compress(response))
+            now = time.time()
+            self.index.save(HttpCacheEntry(
+                url_hash=self._url_hash(url),
+                url=url,
+                headers=dict(response.headers),
+                file_name=os.path.basename(path),
+                size=os.path.getsize(path),
+                fetched=now,
+                accessed=now))
+            self.prune(keep=url)
+        else:
+            # Read the (small) body so that the connection is released
+            response.content
+            # Invalidate previously cached value if the response is not
+            # valid now. Server errors are temporary: the previous value is
+            # kept to be served while the server is down.
+            if not response.ok and response.status_code < 500:
+                self.remove(url)
 
         return response, response.status_code != 304
 
-    def _content_cache_file_path(self, url):
-        return os.path.join(self.cache_directory_path, self._url_hash(url))
+    def _request(self, url, headers):
+        return self.session.get(
+            url, headers=headers, verify=False, allow_redirects=True,
+            stream=True,
+            timeout=getattr(settings, 'DISTRO_TRACKER_HTTP_TIMEOUT', None))
+
+    def _should_compress(self, response):
+        """
+        Whether the content of the given response is worth storing
+        compressed: it must be text and not be known to be smaller than
+        :data:`DISTRO_TRACKER_HTTP_CACHE_COMPRESS_MIN_SIZE
+        <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_CACHE_COMPRESS_MIN_SIZE>`.
+        """
+        min_size = _get_compress_min_size()
+        if min_size is None:
+            return False
+        headers = CaseInsensitiveDict(response.headers)
+        content_type = headers.get('content-type', '')
+        content_type = content_type.split(';')[0].strip().lower()
+        if not content_type.startswith('text/') and not any(
+                subtype in content_type
+                for subtype in ('json', 'xml', 'yaml', 'javascript')):
+            return False
+        content_length = headers.get('content-length', '')
+        return not content_length.isdigit() or int(content_length) >= min_size
+
+    def _write_content(self, url, chunks, compress=False):
+        """
+        Stores the given chunks of bytes as the content of the cached
+        response for the given URL.
+
+        :param compress: Whether the content should be stored gzip compressed
+
+        :returns: The path of the written file
+        """
+        path = self._content_cache_file_path(url, compress)
+        self._write_file(path, chunks, compress=compress)
+        # Remove the previous content if it was stored differently
+        self._remove_content_cache_files(url, keep=path)
+        return path
+
+    def _write_file(self, path, chunks, compress=False):
+        """
+        Writes the given chunks of bytes to a temporary file which then
+        atomically replaces the file found at the given path, so that the
+        readers of the cache never see a partially written file.
+
+        :param compress: Whether the chunks should be gzip compressed
+        """
+        fd, temp_path = tempfile.mkstemp(
+            dir=self.cache_directory_path, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                if compress:
+                    with gzip.GzipFile(
+                            filename='', mode='wb', fileobj=temp_file) as gz:
+                        for chunk in chunks:
+                            gz.write(chunk)
+                else:
+                    for chunk in chunks:
+                        temp_file.write(chunk)
+            os.rename(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+    def prune(self, max_size=None, keep=None):
+        """
+        Removes the least recently used responses until the size of the
+        cache is below the given maximum.
+
+        :param max_size: The maximum size of the cache in bytes. Defaults to
+            :data:`DISTRO_TRACKER_HTTP_CACHE_MAX_SIZE
+            <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_CACHE_MAX_SIZE>`.
+            Nothing is removed if it is ``None``.
+        :param keep: The URL of a response which must not be removed
+
+        :returns: The number of removed responses
+        """
+        if max_size is None:
+            max_size = getattr(settings, 'DISTRO_TRACKER_HTTP_CACHE_MAX_SIZE',
+                               None)
+        if max_size is None:
+            return 0
+        total_size = self.index.total_size()
+        if total_size <= max_size:
+            return 0
+
+        removed = 0
+        for entry in self.index.all():
+            if total_size <= max_size:
+                break
+            if entry.url == keep:
+                continue
+            self.remove(entry.url)
+            total_size -= entry.size
+            removed += 1
+        return removed
+
+    def update_many(self, urls, force=False):
+        """
+        Updates the cached resources of all the given URLs, like
+        :meth:`update` does, but concurrently, using up to
+        :data:`DISTRO_TRACKER_HTTP_PREFETCH_WORKERS
+        <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_PREFETCH_WORKERS>`
+        threads. The number of concurrent requests to a single host is limited
+        by :data:`DISTRO_TRACKER_HTTP_HOST_CONCURRENCY
+        <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_HOST_CONCURRENCY>`
+        and they are started at least
+        :data:`DISTRO_TRACKER_HTTP_HOST_DELAY
+        <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_HOST_DELAY>`
+        seconds apart.
+
+        A failure to update a resource is logged and does not prevent the
+        other ones from being updated.
+
+        :param force: Passed on to :meth:`update`
+
+        :returns: The results of the updates (as returned by :meth:`update`),
+            in the order of the given URLs, ``None`` for the resources which
+            could not be updated
+        :rtype: list
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+
+        # The worker threads are not in the shared session block. The copy
+        # of the cache gives them the session and shares the index.
+        cache = copy.copy(self)
+        cache._session = self.session
+        worker_threads = set()
+
+        def update(url):
+            worker_threads.add(threading.current_thread())
+            try:
+                with _host_slot(url):
+                    return cache.update(url, force=force)
+            except Exception:
+                logger.exception("Could not update %s", url)
+
+        workers = getattr(settings, 'DISTRO_TRACKER_HTTP_PREFETCH_WORKERS', 8)
+        pool = ThreadPool(min(workers, len(urls)))
+        try:
+            return pool.map(update, urls)
+        finally:
+            pool.close()
+            pool.join()
+            self.index.close(worker_threads)
+
+    def prefetch(self, urls, force=False):
+        """
+        Updates concurrently the cached resources of all the given URLs which
+        are expired (all of them if ``force`` is ``True``), using up to
+        :data:`DISTRO_TRACKER_HTTP_PREFETCH_WORKERS
+        <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_PREFETCH_WORKERS>`
+        threads.
+
+        Within a :class:`shared_http_session` block, the results are kept so
+        that the next :meth:`update` of each URL returns them without doing
+        any other request, as if that call had done the update.
+
+        A failure to update a resource is only logged: the task using it
+        gets the error when it tries to update it again.
+
+        :param force: Passed on to :meth:`update`
+
+        :returns: The results of the updates (as returned by :meth:`update`)
+            keyed by URL
+        :rtype: dict
+        """
+        prefetched = getattr(_state, 'prefetched', None)
+        if prefetched is None:
+            prefetched = {}
+        urls = [
+            url for url in collections.OrderedDict.fromkeys(urls)
+            if url not in prefetched and (force or self.is_expired(url))
+        ]
+
+        results = dict(
+            (url, result)
+            for url, result in zip(urls, self.update_many(urls, force=force))
+            if result is not None
+        )
+        for url, result in results.items():
+            prefetched[url] = (result, force)
+        return results
+
+    def _content_cache_file_path(self, url, compressed=False):
+        file_name = self._url_hash(url)
+        if compressed:
+            file_name += '.gz'
+        return os.path.join(self.cache_directory_path, file_name)
+
+    def _find_content_cache_file(self, url):
+        for compressed in (False, True):
+            path = self._content_cache_file_path(url, compressed)
+            if os.path.exists(path):
+                return path
+
+    def _remove_content_cache_files(self, url, keep=None):
+        for compressed in (False, True):
+            path = self._content_cache_file_path(url, compressed)
+            if path != keep and os.path.exists(path):
+                os.remove(path)
 
     def _header_cache_file_path(self, url):
         url_hash = self._url_hash(url)
@@ -178,7 +994,12 @@ def get_resource_content(url, cache=None):
     content has not expired, the function will not do any HTTP requests and
     will return the cached content.
 
-    If the resource is stale or not cached at all, it is from the Web.
+    If the resource is stale or not cached at all, it is retrieved from the
+    Web. When this fails (the server cannot be reached or answers with an
+    error), the stale content is returned with a warning, unless it was
+    fetched more than :data:`DISTRO_TRACKER_HTTP_CACHE_MAX_STALE
+    <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_CACHE_MAX_STALE>`
+    seconds ago.
 
     :param url: The URL of the resource to be retrieved
     :param cache: A cache object which should be used to look up and store
@@ -189,15 +1010,109 @@ def get_resource_content(url, cache=None):
     :type cache: :class:`HttpCache` or an object with an equivalent interface
 
     :returns: The bytes representation of the resource found at the given url
+        or ``None`` if neither the resource nor a usable stale content is
+        available.
     :rtype: bytes
     """
+    cache = _retrieve_resource(url, cache)
+    if cache is not None:
+        return cache.get_content(url)
+
+
+def get_resource_lines(url, cache=None, encoding='utf-8'):
+    """
+    A variant of :func:`get_resource_content` which returns an iterator over
+    the lines of the resource, without their line terminators, so that it
+    can be processed without loading it entirely in memory.
+
+    :param encoding: The encoding of the resource. If ``None``, the lines are
+        given as bytes.
+
+    :returns: An iterator over the lines of the resource found at the given
+        url or ``None`` if neither the resource nor a usable stale content is
+        available.
+    """
+    cache = _retrieve_resource(url, cache)
+    if cache is not None:
+        return cache.iter_lines(url, encoding)
+
+
+def _retrieve_resource(url, cache):
+    """
+    Retrieves the resource found at the given URL in the given cache, unless
+    the cached response is still fresh, as described by
+    :func:`get_resource_content`.
+
+    :returns: The cache, or ``None`` if it has no usable response.
+    """
     if cache is None:
         cache_directory_path = settings.DISTRO_TRACKER_CACHE_DIRECTORY
         cache = HttpCache(cache_directory_path)
+    max_stale = getattr(settings, 'DISTRO_TRACKER_HTTP_CACHE_MAX_STALE',
+                        7 * 24 * 3600)
 
     try:
         if cache.is_expired(url):
-            cache.update(url)
-        return cache.get_content(url)
-    except:
-        pass
+            response = cache.update(url)[0]
+            response.raise_for_status()
+    except (requests.exceptions.RequestException, EnvironmentError):
+        if not _is_usable(cache, url, max_stale):
+            logger.exception("Could not retrieve %s", url)
+            return None
+        logger.warning("Could not retrieve %s, using the cached content",
+                       url, exc_info=True)
+    return cache
+
+
+def _is_usable(cache, url, max_stale):
+    """
+    Whether the cached content of the given URL is not older than
+    ``max_stale`` seconds.
+    """
+    age = cache.get_age(url)
+    return age is not None and age <= max_stale
+
+
+def run_concurrently(functions):
+    """
+    Calls the given functions concurrently and gathers their results: a
+    fan-out/fan-in helper for the tasks using several resources, where each
+    function typically retrieves and parses one of them.
+
+    The functions run in up to
+    :data:`DISTRO_TRACKER_HTTP_PREFETCH_WORKERS
+    <distro_tracker.project.settings.DISTRO_TRACKER_HTTP_PREFETCH_WORKERS>`
+    threads, which use the HTTP session and the prefetched responses of the
+    calling thread when it is within a :class:`shared_http_session` block.
+
+    :param functions: Maps keys to the functions to call, without arguments.
+    :type functions: dict
+
+    :returns: A dict mapping the same keys to the values returned by the
+        functions.
+    :raises: The exception raised by one of the functions, once all of them
+        have returned.
+    """
+    keys = list(functions)
+    if len(keys) <= 1:
+        return dict((key, functions[key]()) for key in keys)
+
+    session = get_shared_http_session()
+    prefetched = getattr(_state, 'prefetched', None)
+
+    def call(key):
+        _state.session = session
+        _state.prefetched = prefetched
+        try:
+            return functions[key]()
+        finally:
+            _state.session = None
+            _state.prefetched = None
+
+    workers = getattr(settings, 'DISTRO_TRACKER_HTTP_PREFETCH_WORKERS', 8)
+    pool = ThreadPool(min(workers, len(keys)))
+    try:
+        return dict(zip(keys, pool.map(call, keys)))
+    finally:
+        pool.close()
+        pool.join()
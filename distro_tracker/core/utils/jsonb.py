@@ -0,0 +1,181 @@
+# Copyright 2016 The Distro Tracker Developers
+# See the COPYRIGHT file at the top-level directory of this distribution and
+# at https://deb.li/DTAuthors
+#
+# This file is part of Distro Tracker. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this
+# distribution and at https://deb.li/DTLicense. No part of Distro Tracker,
+# including this file, may be copied, modified, propagated, or distributed
+# except according to the terms contained in the LICENSE file.
+"""
+JSON storage which uses the ``jsonb`` type of PostgreSQL when available.
+"""
+from __future__ import unicode_literals
+from django.db.utils import NotSupportedError
+from django.utils import six
+
+import jsonfield
+
+try:
+    from django.contrib.postgres.fields.jsonb import \
+        KeyTransform as PostgresKeyTransform
+except ImportError:
+    # Django 1.8 or psycopg2 not installed: no lookups on JSON keys
+    PostgresKeyTransform = None
+
+
+if PostgresKeyTransform is not None:
+    class KeyTransform(PostgresKeyTransform):
+        """
+        The key transform of :mod:`django.contrib.postgres`, restricted to the
+        PostgreSQL connections since the other databases store the JSON
+        values as text.
+        """
+        def as_sql(self, compiler, connection):
+            raise NotSupportedError(
+                'Lookups on JSON keys are only supported on PostgreSQL')
+
+        def as_postgresql(self, compiler, connection):
+            return super(KeyTransform, self).as_sql(compiler, connection)
+
+    class KeyTransformFactory(object):
+        def __init__(self, key_name):
+            self.key_name = key_name
+
+        def __call__(self, *args, **kwargs):
+            return KeyTransform(self.key_name, *args, **kwargs)
+else:
+    KeyTransformFactory = None
+
+
+class JSONField(jsonfield.JSONField):
+    """
+    A :class:`jsonfield.JSONField` which accepts the values already decoded
+    by the database driver. :mod:`jsonfield` stores it in a ``jsonb`` column
+    on PostgreSQL (9.4 or later) and in a text column on the other databases.
+
+    On PostgreSQL, the keys of the stored JSON objects can be used in lookups
+    (for instance ``value__errors__gt=0``) so that queries on the content are
+    run by the database instead of by scanning all rows in Python. Such
+    lookups raise :class:`NotSupportedError
+    <django.db.utils.NotSupportedError>` on the other databases.
+    """
+    def from_db_value(self, value, expression, connection, context):
+        if value is not None and not isinstance(value, six.string_types):
+            # The database driver already decoded the JSON value
+            return value
+        return super(JSONField, self).from_db_value(
+            value, expression, connection, context)
+
+    def get_transform(self, name):
+        transform = super(JSONField, self).get_transform(name)
+        if transform is not None or KeyTransformFactory is None:
+            return transform
+        # The SQL is chosen by the transform for each connection
+        return KeyTransformFactory(name)
+
+
+def _is_jsonb_available(connection):
+    return connection.vendor == 'postgresql' and \
+        connection.pg_version >= 90400
+
+
+def convert_to_jsonb(apps, schema_editor, app_label):
+    """
+    Converts the text columns of all :class:`JSONField` fields of the models
+    of the given application to ``jsonb`` columns.
+
+    It does nothing on databases other than PostgreSQL. It is meant to be
+    used by data migrations with a
+    :class:`RunPython <django.db.migrations.operations.RunPython>` operation,
+    the migration altering the fields only in the migration state (with
+    :class:`SeparateDatabaseAndState
+    <django.db.migrations.operations.SeparateDatabaseAndState>`) since the
+    empty strings stored in the text columns cannot be cast to ``jsonb``.
+
+    :param app_label: The label of the application
+    :type app_label: string
+    """
+    # Empty strings are not valid JSON documents
+    _alter_json_columns(
+        apps, schema_editor, app_label, 'jsonb',
+        "(CASE WHEN {column} = '' THEN 'null' ELSE {column} END)::jsonb")
+
+
+def convert_from_jsonb(apps, schema_editor, app_label):
+    """
+    Converts back the ``jsonb`` columns of all :class:`JSONField` fields of
+    the models of the given application to text columns, reverting
+    :func:`convert_to_jsonb`.
+
+    :param app_label: The label of the application
+    :type app_label: string
+    """
+    _alter_json_columns(
+        apps, schema_editor, app_label, 'text', '{column}::text')
+
+
+def _alter_json_columns(apps, schema_editor, app_label, data_type, using):
+    """
+    Changes the type of the columns of the :class:`JSONField` fields of the
+    models of the given application which do not have the given type yet,
+    converting their values with the given ``using`` SQL expression.
+    """
+    connection = schema_editor.connection
+    if not _is_jsonb_available(connection):
+        return
+
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for model in apps.get_app_config(app_label).get_models():
+            table = model._meta.db_table
+            for field in model._meta.local_fields:
+                if not isinstance(field, jsonfield.JSONField):
+                    continue
+                cursor.execute(
+                    'SELECT data_type FROM information_schema.columns '
+                    'WHERE table_name = %s AND column_name = %s',
+                    [table, field.column])
+                row = cursor.fetchone()
+                if row is None or row[0] == data_type:
+                    continue
+                column = quote_name(field.column)
+                schema_editor.execute(
+                    'ALTER TABLE {table} ALTER COLUMN {column} TYPE {type} '
+                    'USING {using}'.format(
+                        table=quote_name(table), column=column,
+                        type=data_type, using=using.format(column=column)))
+
+
+def create_gin_index(schema_editor, table, column):
+    """
+    Creates a GIN index on a ``jsonb`` column.
+
+    The index uses the default ``jsonb_ops`` operator class, which serves the
+    containment (``@>``) and key existence (``?``, ``?|`` and ``?&``)
+    operators. It is not used by the comparisons of the values of keys
+    (such as ``value__errors__gt=0``), which need an index on the expression
+    of the key.
+
+    It does nothing on databases other than PostgreSQL.
+    """
+    connection = schema_editor.connection
+    if not _is_jsonb_available(connection):
+        return
+    quote_name = connection.ops.quote_name
+    schema_editor.execute(
+        'CREATE INDEX {name} ON {table} USING gin ({column})'.format(
+            name=quote_name('{}_{}_gin'.format(table, column)),
+            table=quote_name(table),
+            column=quote_name(column)))
+
+
+def drop_gin_index(schema_editor, table, column):
+    """
+    Drops an index created by :func:`create_gin_index`.
+    """
+    connection = schema_editor.connection
+    if not _is_jsonb_available(connection):
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS {name}'.format(
+        name=connection.ops.quote_name('{}_{}_gin'.format(table, column))))
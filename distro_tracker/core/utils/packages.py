@@ -20,6 +20,7 @@ from debian import deb822
 from distro_tracker.core.utils import extract_tar_archive
 
 import os
+import re
 import apt
 import shutil
 import apt_pkg
@@ -47,6 +48,76 @@ def package_hashdir(package_name):
         return package_name[0:1]
 
 
+def _version_part_sort_key(part):
+    """
+    Encodes an upstream version or a Debian revision following the
+    comparison algorithm of dpkg (see :func:`version_sort_key`).
+
+    :rtype: list of integers
+    """
+    # The part alternates between non-digit and digit runs, starting with a
+    # (possibly empty) non-digit run.
+    tokens = [
+        (non_digits, digits.lstrip('0'))
+        for non_digits, digits in re.findall(r'(\D*)(\d*)', part)
+    ]
+    # A missing token is equal to ('', 0), so trailing tokens of this kind
+    # are dropped to have identical keys for equal versions.
+    while tokens and tokens[-1] == ('', ''):
+        tokens.pop()
+
+    encoded = []
+    for non_digits, number in tokens:
+        for char in non_digits:
+            if char == '~':
+                encoded.append(0x01)
+            elif char.isalpha() and ord(char) < 0x80:
+                encoded.append(ord(char))
+            else:
+                encoded.append(min(ord(char) + 0x80, 0xff))
+        # Terminates the non-digit run
+        encoded.append(0x03)
+        number = number[:0xff]
+        encoded.append(len(number))
+        encoded.extend(ord(digit) for digit in number)
+    # The end of the part is equal to an infinite sequence of ('', 0)
+    # tokens, which sorts after a tilde but before anything else
+    encoded.extend([0x03, 0x00, 0x02])
+    return encoded
+
+
+def version_sort_key(version):
+    """
+    Returns a key which sorts in the same order as the Debian package
+    versions are compared by dpkg.
+
+    The key is an hexadecimal string which can be stored in the database and
+    used to sort package versions with a plain ``ORDER BY``: two keys compare
+    the same way under any collation since they contain only digits and
+    lowercase letters.
+
+    :param version: The Debian version
+    :type version: string
+
+    :rtype: string
+    """
+    epoch, rest = '', version
+    if ':' in version:
+        epoch, rest = version.split(':', 1)
+    upstream, revision = rest, ''
+    if '-' in rest:
+        upstream, revision = rest.rsplit('-', 1)
+    epoch = epoch.lstrip('0')
+    if not epoch.isdigit():
+        epoch = ''
+
+    encoded = [len(epoch)]
+    encoded.extend(ord(digit) for digit in epoch)
+    encoded.extend(_version_part_sort_key(upstream))
+    encoded.extend(_version_part_sort_key(revision))
+    return ''.join('{:02x}'.format(byte) for byte in encoded)
+
+
 def extract_vcs_information(stanza):
     """
     Extracts the VCS information from a package's Sources entry.
@@ -28,6 +28,7 @@ from django.core.mail import send_mail
 from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse, reverse_lazy
 from django.utils.http import urlquote
+from distro_tracker.core.db_router import read_replicas
 from distro_tracker.core.models import get_web_package
 from distro_tracker.core.forms import CreateTeamForm
 from distro_tracker.core.forms import AddTeamMemberForm
@@ -47,6 +48,7 @@ from distro_tracker.core.utils import get_or_none
 from distro_tracker.core.utils import distro_tracker_render_to_string
 
 
+@read_replicas()
 def package_page(request, package_name):
     """
     Renders the package page.
@@ -131,6 +133,7 @@ class PackageAutocompleteView(View):
     their name starts with the given query parameter.
     """
     @method_decorator(cache_control(must_revalidate=True, max_age=3600))
+    @method_decorator(read_replicas())
     def get(self, request):
         if 'q' not in request.GET:
             raise Http404
@@ -190,6 +193,7 @@ class PackageNews(ListView):
     template_name = 'core/package_news.html'
     context_object_name = 'news'
 
+    @method_decorator(read_replicas())
     def get(self, request, package_name):
         self.package = get_object_or_404(PackageName, name=package_name)
         return super(PackageNews, self).get(request, package_name)
@@ -203,6 +207,14 @@ class PackageNews(ListView):
         context['package'] = self.package
         return context
 
+    def render_to_response(self, context, **response_kwargs):
+        response = super(PackageNews, self).render_to_response(
+            context, **response_kwargs)
+        # The news of the page are only fetched when the template is
+        # rendered, which would otherwise happen after get() returns.
+        with read_replicas():
+            return response.render()
+
 
 class ActionItemJsonView(View):
     """
@@ -265,6 +277,8 @@ class TeamDetailsView(DetailView):
 
     def get_context_data(self, **kwargs):
         context = super(TeamDetailsView, self).get_context_data(**kwargs)
+        context['team_packages'] = self.object.packages.select_related(
+            'counters').order_by('name')
         if self.request.user.is_authenticated():
             context['user_member_of_team'] = self.object.user_is_member(
                 self.request.user)
@@ -62,15 +62,18 @@ def categorize_version_comparison(a, b):
 
 
 def compare_repositories(deriv_repository, parent_repository):
-    # create a dict with all source packages and versions
+    # create a dict with all source packages and versions, entries are
+    # sorted by increasing version so that the highest version is kept
     all_pkgs = collections.defaultdict(lambda: {})
-    for name, version in deriv_repository.source_entries.values_list(
-            'source_package__source_package_name__name',
-            'source_package__version'):
+    for name, version in deriv_repository.source_entries.order_by(
+            'source_package__version_key').values_list(
+                'source_package__source_package_name__name',
+                'source_package__version'):
         all_pkgs[name]['deriv_version'] = version
-    for name, version in parent_repository.source_entries.values_list(
-            'source_package__source_package_name__name',
-            'source_package__version'):
+    for name, version in parent_repository.source_entries.order_by(
+            'source_package__version_key').values_list(
+                'source_package__source_package_name__name',
+                'source_package__version'):
         all_pkgs[name]['parent_version'] = version
 
     for pkg in all_pkgs:
@@ -17,6 +17,7 @@ import json
 
 from distro_tracker.core.models import PackageName
 from distro_tracker.core.utils import get_or_none
+from distro_tracker.core.db_router import read_replicas
 
 
 class Command(BaseCommand):
@@ -56,6 +57,7 @@ class Command(BaseCommand):
         if self.verbose:
             self.stderr.write("Warning: {}".format(message))
 
+    @read_replicas()
     def handle(self, *args, **kwargs):
         self.verbose = int(kwargs.get('verbosity', 1)) > 1
         inactive = kwargs['inactive']
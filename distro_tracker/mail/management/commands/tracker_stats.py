@@ -13,12 +13,14 @@ Implements the command which outputs statistics.
 from __future__ import unicode_literals
 from __future__ import print_function
 from django.core.management.base import BaseCommand
+from django.db.models import Sum
 from django.utils import timezone
 
 import json
 
-from distro_tracker.core.models import SourcePackageName, Subscription
+from distro_tracker.core.models import PackageCounters
 from distro_tracker.core.models import UserEmail
+from distro_tracker.core.db_router import read_replicas
 
 
 class Command(BaseCommand):
@@ -31,6 +33,8 @@ class Command(BaseCommand):
         "- Total number of source packages with at least one subscription\n"
         "- Total number of subscriptions\n"
         "- Total number of unique emails\n"
+        "The package and subscription numbers are read from the package\n"
+        "counters, as computed by the last run of the counters task.\n"
     )
 
     def add_arguments(self, parser):
@@ -41,14 +45,18 @@ class Command(BaseCommand):
             help='Output the result encoded as a JSON object'
         )
 
+    @read_replicas()
     def handle(self, *args, **kwargs):
 
         from collections import OrderedDict
+        counters = PackageCounters.objects.filter(subscriber_count__gt=0)
+        subscription_number = counters.aggregate(
+            total=Sum('subscriber_count'))['total']
         # Necessary to keep ordering because of the legacy output format.
         stats = OrderedDict((
             ('package_number',
-             SourcePackageName.objects.all_with_subscribers().count()),
-            ('subscription_number', Subscription.objects.count()),
+             counters.filter(package__source=True).count()),
+            ('subscription_number', subscription_number or 0),
             ('date', timezone.now().strftime('%Y-%m-%d')),
             ('unique_emails_number', UserEmail.objects.count()),
         ))
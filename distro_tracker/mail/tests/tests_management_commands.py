@@ -22,6 +22,7 @@ from django.core.management.base import CommandError
 from distro_tracker.core.models import PackageName, UserEmail, EmailSettings
 from distro_tracker.core.models import Subscription, Keyword
 from distro_tracker.core.models import SourcePackageName, PseudoPackageName
+from distro_tracker.core.models import PackageCounters
 
 from django.conf import settings
 from django.core import mail
@@ -354,6 +355,7 @@ class StatsCommandTest(CommandWithOutputTestCase):
             for package in SourcePackageName.objects.all():
                 Subscription.objects.create(email_settings=email_settings,
                                             package=package)
+        PackageCounters.objects.refresh()
 
     def test_legacy_output(self):
         self.call_command()
@@ -379,6 +381,24 @@ class StatsCommandTest(CommandWithOutputTestCase):
         }
         self.assertDictEqual(expected, output)
 
+    def test_pseudo_package_subscriptions(self):
+        """
+        Tests that the subscriptions to pseudo packages are counted, but not
+        the pseudo packages themselves.
+        """
+        email_settings = EmailSettings.objects.all()[0]
+        Subscription.objects.create(
+            email_settings=email_settings,
+            package=PseudoPackageName.objects.get(name='pseudo'))
+        PackageCounters.objects.refresh()
+
+        self.call_command(json=True)
+
+        output = json.loads(self.out)
+        self.assertEqual(self.package_count, output['package_number'])
+        self.assertEqual(self.subscription_count + 1,
+                         output['subscription_number'])
+
 
 class AddKeywordManagementCommandTest(TestCase):
     def test_simple_add(self):
@@ -9,3 +9,11 @@ DATABASES = {
         }
     }
 }
+
+# To try the read replica routing locally, declare a copy of the database
+# as a replica:
+#
+# DATABASES['replica'] = dict(DATABASES['default'],
+#                             NAME='distro-tracker-replica.sqlite',
+#                             TEST={'MIRROR': 'default'})
+# DISTRO_TRACKER_DATABASE_REPLICAS = ['replica']
@@ -38,6 +38,17 @@ DISTRO_TRACKER_DEBIAN_PIUPARTS_SUITES = (
     'sid',
 )
 
+#: The number of bugs whose status is requested in a single call to the
+#: SOAP interface of the BTS
+DISTRO_TRACKER_DEBIAN_BTS_CHUNK_SIZE = 500
+
+#: The number of calls to the SOAP interface of the BTS made concurrently
+DISTRO_TRACKER_DEBIAN_BTS_WORKERS = 4
+
+#: The number of seconds during which the status of a bug retrieved from the
+#: BTS is reused instead of being requested again
+DISTRO_TRACKER_DEBIAN_BTS_STATUS_TTL = 30 * 60
+
 #: The page documenting package removals
 DISTRO_TRACKER_REMOVALS_URL = "https://ftp-master.debian.org/removals.txt"
 
@@ -96,6 +96,11 @@ of those settings.
     templates supplied by distro-tracker. Defaults to the "templates"
     sub-directory of py:data:`DISTRO_TRACKER_DATA_PATH`.
 
+:py:data:`DISTRO_TRACKER_HTTP_FIXTURES_DIRECTORY`
+    This directory holds the HTTP responses recorded and replayed according
+    to :py:data:`DISTRO_TRACKER_HTTP_FIXTURES_MODE`. Defaults to the
+    "http-fixtures" sub-directory of py:data:`DISTRO_TRACKER_DATA_PATH`.
+
 :py:data:`DISTRO_TRACKER_CONTROL_EMAIL`
     The email address which is to receive control emails.
     It does not necessarily have to be in the same domain as specified in
@@ -226,10 +231,15 @@ MIDDLEWARE_CLASSES = (
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.auth.middleware.SessionAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'distro_tracker.core.db_router.ReadReplicaMiddleware',
     # Disabled to allow rendering in iframes
     # 'django.middleware.clickjacking.XFrameOptionsMiddleware',
 )
 
+DATABASE_ROUTERS = [
+    'distro_tracker.core.db_router.ReadReplicaRouter',
+]
+
 AUTHENTICATION_BACKENDS = (
     'django_email_accounts.auth.UserEmailBackend',
 )
@@ -398,6 +408,53 @@ DISTRO_TRACKER_APT_CACHE_MAX_SIZE = 5 * 1024 ** 3  # 5 GiB
 #: package
 DISTRO_TRACKER_ACCEPT_UNQUALIFIED_EMAILS = False
 
+#: The aliases of the databases (declared in ``DATABASES``) which are read
+#: replicas of the default database. The read-only code paths (package
+#: pages, news feeds, statistics, etc.) query them instead of the default
+#: database. See :mod:`distro_tracker.core.db_router`.
+DISTRO_TRACKER_DATABASE_REPLICAS = []
+#: The number of seconds during which the reads are sent to the default
+#: database after a write, to hide the replication lag of the replicas.
+DISTRO_TRACKER_DATABASE_REPLICA_STICKY_SECONDS = 15
+
+#: The timeout of the HTTP requests made by
+#: :class:`distro_tracker.core.utils.http.HttpCache`, given in seconds as
+#: a (connect timeout, read timeout) tuple.
+DISTRO_TRACKER_HTTP_TIMEOUT = (10, 120)
+#: The number of times a failed HTTP request (connection error or 5xx
+#: response) is retried before giving up.
+DISTRO_TRACKER_HTTP_RETRIES = 3
+#: The maximum number of connections kept alive for each host by the HTTP
+#: sessions.
+DISTRO_TRACKER_HTTP_POOL_SIZE = 10
+#: The number of threads used to fetch concurrently the HTTP resources
+#: declared by the tasks before running them.
+DISTRO_TRACKER_HTTP_PREFETCH_WORKERS = 8
+#: The maximum number of concurrent requests made to a single host when
+#: fetching several HTTP resources at once.
+DISTRO_TRACKER_HTTP_HOST_CONCURRENCY = 4
+#: The minimum delay (in seconds) between the starts of two requests to a
+#: single host when fetching several HTTP resources at once.
+DISTRO_TRACKER_HTTP_HOST_DELAY = 0
+#: The minimum size (in bytes) of the text HTTP responses which are stored
+#: gzip compressed in the cache of Web resources. ``None`` disables the
+#: compression.
+DISTRO_TRACKER_HTTP_CACHE_COMPRESS_MIN_SIZE = 16 * 1024
+#: The maximum size (in bytes) of the cache of Web resources. The least
+#: recently used resources are removed when it grows bigger. ``None``
+#: disables the limit.
+DISTRO_TRACKER_HTTP_CACHE_MAX_SIZE = 2 * 1024 ** 3  # 2 GiB
+#: The maximum age (in seconds) of the cached content of a Web resource
+#: which is used when the resource cannot be retrieved (e.g. when its server
+#: is down).
+DISTRO_TRACKER_HTTP_CACHE_MAX_STALE = 7 * 24 * 3600  # 1 week
+#: When set to ``'record'``, the responses to all the HTTP requests made
+#: through :func:`distro_tracker.core.utils.http.create_http_session` are
+#: stored in :data:`DISTRO_TRACKER_HTTP_FIXTURES_DIRECTORY`. When set to
+#: ``'replay'``, they are served from this directory instead of the network,
+#: so that the update tasks can be run (and timed) offline.
+DISTRO_TRACKER_HTTP_FIXTURES_MODE = None
+
 DJANGO_EMAIL_ACCOUNTS_POST_MERGE_HOOK = \
     'distro_tracker.accounts.hooks.post_merge'
 
@@ -442,6 +499,8 @@ _COMPUTE_DEFAULT_SETTINGS = (
      lambda t: os.path.join(t['DISTRO_TRACKER_DATA_PATH'], 'logs')),
     ('DISTRO_TRACKER_MAILDIR_DIRECTORY',
      lambda t: os.path.join(t['DISTRO_TRACKER_DATA_PATH'], 'maildir')),
+    ('DISTRO_TRACKER_HTTP_FIXTURES_DIRECTORY',
+     lambda t: os.path.join(t['DISTRO_TRACKER_DATA_PATH'], 'http-fixtures')),
 )
 
 
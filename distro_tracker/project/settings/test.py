@@ -2,6 +2,7 @@
 
 from .development import *  # noqa
 from .defaults import INSTALLED_APPS
+from .db_sqlite import DATABASES
 
 # Don't use bcrypt to run tests (speed gain)
 PASSWORD_HASHERS = (
@@ -17,3 +18,11 @@ INSTALLED_APPS += (
     'distro_tracker.vendor',
     'distro_tracker.vendor.debian',
 )
+
+# A second database, used as a read replica by the tests of the database
+# routing which list it in DISTRO_TRACKER_DATABASE_REPLICAS
+DATABASES = dict(DATABASES)
+DATABASES['replica'] = dict(
+    DATABASES['default'],
+    NAME='distro-tracker-replica.sqlite',
+    TEST={'NAME': 'distro-tracker-replica-test.sqlite'})
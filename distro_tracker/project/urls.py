@@ -46,6 +46,7 @@ from distro_tracker.core.views import EditMembershipView
 from distro_tracker.core.views import IndexView
 from distro_tracker.core.views import PackageNews
 from distro_tracker.core.news_feed import PackageNewsFeed
+from distro_tracker.core.db_router import read_replicas
 from distro_tracker.accounts.views import ConfirmAddAccountEmail
 from distro_tracker.accounts.views import LoginView
 from distro_tracker.accounts.views import AccountMergeFinalize
@@ -226,7 +227,7 @@ urlpatterns = [
     url(r'^pkg/(?P<package_name>[^/]+)/?$', package_page,
         name='dtracker-package-page'),
     # RSS news feed
-    url(r'^pkg/(?P<package_name>.+)/rss$', PackageNewsFeed(),
+    url(r'^pkg/(?P<package_name>.+)/rss$', read_replicas()(PackageNewsFeed()),
         name='dtracker-package-rss-news-feed'),
 
     # Uncomment the admin/doc line below to enable admin documentation:
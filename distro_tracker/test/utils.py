@@ -16,6 +16,7 @@ from distro_tracker.core.models import SourcePackage
 from distro_tracker.core.models import SourcePackageName
 from distro_tracker.core.models import BinaryPackageName
 
+import requests
 import shutil
 import tempfile
 import contextlib
@@ -105,4 +106,10 @@ def set_mock_response(mock_requests, text="", headers=None, status_code=200):
     mock_response.text = text
     mock_response.content = text.encode('utf-8')
     mock_response.iter_lines.return_value = text.splitlines()
+    mock_response.iter_content.return_value = [mock_response.content]
+    if not mock_response.ok:
+        mock_response.raise_for_status.side_effect = (
+            requests.exceptions.HTTPError(response=mock_response))
+    mock_requests.exceptions = requests.exceptions
     mock_requests.get.return_value = mock_response
+    mock_requests.Session.return_value.get.return_value = mock_response
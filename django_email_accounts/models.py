@@ -9,6 +9,7 @@
 # except according to the terms contained in the LICENSE file.
 from __future__ import unicode_literals
 from django.db import models
+from django.db.models.functions import Lower
 from django.conf import settings
 from django.utils.encoding import python_2_unicode_compatible
 from django.contrib.auth.models import AbstractBaseUser
@@ -183,6 +184,7 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 
 class UserEmailManager(models.Manager):
+    CHUNK_SIZE = 500
 
     def get_or_create(self, *args, **kwargs):
         """
@@ -197,6 +199,48 @@ class UserEmailManager(models.Manager):
         kwargs['defaults'] = defaults
         return UserEmail.default_manager.get_or_create(*args, **kwargs)
 
+    def get_or_create_many(self, emails):
+        """
+        Does what :meth:`get_or_create` does for each of the given emails
+        (matching them case-insensitively) with a few queries per chunk of
+        emails instead of a few queries per email.
+
+        :returns: A dict mapping each of the given emails to its
+            :class:`UserEmail`.
+        """
+        variants = {}
+        for email in set(emails):
+            variants.setdefault(email.lower(), []).append(email)
+
+        user_emails = {}
+        lowered = list(variants)
+        for start in range(0, len(lowered), self.CHUNK_SIZE):
+            found = UserEmail.default_manager.annotate(
+                lower_email=Lower('email')).filter(
+                lower_email__in=lowered[start:start + self.CHUNK_SIZE])
+            for user_email in found.order_by('id'):
+                user_emails.setdefault(user_email.lower_email, user_email)
+
+        missing = [
+            variant_emails[0]
+            for lower_email, variant_emails in variants.items()
+            if lower_email not in user_emails
+        ]
+        UserEmail.default_manager.bulk_create(
+            [UserEmail(email=email) for email in missing],
+            batch_size=self.CHUNK_SIZE)
+        for start in range(0, len(missing), self.CHUNK_SIZE):
+            created = UserEmail.default_manager.filter(
+                email__in=missing[start:start + self.CHUNK_SIZE])
+            for user_email in created:
+                user_emails[user_email.email.lower()] = user_email
+
+        return {
+            email: user_emails[lower_email]
+            for lower_email, variant_emails in variants.items()
+            for email in variant_emails
+        }
+
 
 @python_2_unicode_compatible
 class UserEmail(models.Model):
@@ -22,3 +22,13 @@ class UserEmailTests(TestCase):
             email='myemail@example.net')
         self.assertFalse(created)
         self.assertEqual(orig_user_email.pk, user_email.pk)
+
+    def test_user_email_get_or_create_many(self):
+        orig_user_email = UserEmail.objects.create(email='MyEmail@example.net')
+        user_emails = UserEmail.objects.get_or_create_many([
+            'myemail@example.net', 'new@example.net', 'NEW@example.net'])
+        self.assertEqual(orig_user_email.pk,
+                         user_emails['myemail@example.net'].pk)
+        self.assertEqual(user_emails['new@example.net'].pk,
+                         user_emails['NEW@example.net'].pk)
+        self.assertEqual(2, UserEmail.objects.count())